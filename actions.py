@@ -2,17 +2,16 @@ import sys
 import random
 import time
 import pygame
+import numpy as np
 from map_io import autosave_map
-from utils import get_distance, rotate_selection_90, flip_selection_horizontal, flip_selection_vertical, shift_map
+from utils import get_distance, rotate_selection_90
 from drawing import place_tile_at, flood_fill, draw_line, draw_rectangle, draw_circle
 from menu import (
-    menu_save_map, menu_autosave_settings, menu_editor_pause,
-    menu_define_brush, menu_define_pattern, NewMapState, LoadMapState, ExportMapState, menu_resize_map,
-    menu_statistics, menu_random_generation,
-    menu_perlin_generation, menu_voronoi_generation,
-    MessageState, ConfirmationState, TextInputState, HelpState
+    menu_save_map, menu_autosave_settings,
+    menu_define_brush, menu_define_pattern, menu_statistics
 )
 from core import Map
+from viewport import SplitView
 from tiles import REGISTRY
 
 def check_autosave(session, manager):
@@ -41,7 +40,7 @@ def show_message(manager, text, notify=False):
 
 def handle_quit(session, manager, action=None):
     flow = manager.flow
-    if session.map_obj.dirty:
+    if any(m.dirty for m in session.open_maps()):
         def on_confirm(confirmed):
             if confirmed: flow.exit_to_menu()
         flow.push_confirmation("Unsaved! Quit anyway? (y/n): ", on_confirm)
@@ -180,8 +179,7 @@ def handle_flood_fill(session, manager, action=None):
 def handle_undo_redo(session, manager, action=None):
     res = session.undo_stack.undo(session.map_obj.copy_data()) if action == 'undo' else session.undo_stack.redo(session.map_obj.copy_data())
     if res is not None:
-        session.map_obj.data = res
-        session.map_obj.dirty = True
+        session.map_obj.replace_data(res)
         session.selection_start = session.selection_end = None
         check_autosave(session, manager)
         show_message(manager, f"{action.capitalize()} successful", notify=True)
@@ -273,22 +271,26 @@ def handle_rotate_selection_action(session, manager, action=None):
 def handle_map_transform(session, manager, action=None):
     session.map_obj.push_undo()
     if action == 'map_rotate':
-        new_data = rotate_selection_90(session.map_obj.data)
+        # Clockwise, like rotate_selection_90
+        new_data = np.rot90(session.map_obj.data, -1)
         session.map_obj = Map(session.map_obj.height, session.map_obj.width, new_data, undo_stack=session.undo_stack)
         session.camera_x = session.camera_y = 0
-    elif action == 'map_flip_h': session.map_obj.data = flip_selection_horizontal(session.map_obj.data)
-    elif action == 'map_flip_v': session.map_obj.data = flip_selection_vertical(session.map_obj.data)
+    elif action == 'map_flip_h': session.map_obj.replace_data(session.map_obj.data[:, ::-1].copy())
+    elif action == 'map_flip_v': session.map_obj.replace_data(session.map_obj.data[::-1].copy())
     elif action.startswith('map_shift_'):
         dx, dy = 0, 0
         if 'up' in action: dy = -1
         elif 'down' in action: dy = 1
         elif 'left' in action: dx = -1
         elif 'right' in action: dx = 1
-        session.map_obj.data = shift_map(session.map_obj.data, dx, dy)
+        # Wraps around the edges
+        session.map_obj.replace_data(np.roll(session.map_obj.data, (dy, dx), axis=(0, 1)))
     session.tool_state.edits_since_save += 1
     check_autosave(session, manager)
 
 def handle_generation(session, manager, action=None):
+    # Loaded on first use: pulls in scipy and tcod
+    from menu.generation import menu_random_generation, menu_perlin_generation, menu_voronoi_generation
     session.map_obj.push_undo()
     success = False
     if action == 'random_gen': success = menu_random_generation(manager, session.map_obj, session.tool_state.seed)
@@ -378,6 +380,16 @@ def handle_toggle_snap(session, manager, action=None):
 def handle_toggle_palette(session, manager, action=None):
     session.tool_state.show_palette = not session.tool_state.show_palette
 
+def handle_toggle_minimap(session, manager, action=None):
+    session.tool_state.show_minimap = not session.tool_state.show_minimap
+
+def handle_toggle_profiler(session, manager, action=None):
+    manager.flow.renderer.profiler.toggle()
+
+def handle_split_view(session, manager, action=None):
+    # 1, 2, ... MAX_VIEWS views, then back to one
+    session.tool_state.split_views = session.tool_state.split_views % SplitView.MAX_VIEWS + 1
+
 def handle_toggle_autotile(session, manager, action=None):
     session.tool_state.auto_tiling = not session.tool_state.auto_tiling
 
@@ -434,6 +446,32 @@ def handle_file_ops(session, manager, action=None):
     elif action == 'export_image':
         manager.flow.push_export_wizard(session.map_obj)
 
+def handle_tabs(session, manager, action=None):
+    def report():
+        show_message(manager, f"Map {session.active_tab + 1}/{len(session.tabs)}", notify=True)
+    def on_map(m):
+        if m:
+            session.open_tab(m)
+            report()
+    def close():
+        session.close_tab()
+        report()
+
+    if action == 'new_tab':
+        manager.flow.push_new_map_wizard(session.view_width, session.view_height, on_map)
+    elif action == 'open_tab':
+        manager.flow.push_load_map_wizard(session.view_width, session.view_height, on_map)
+    elif action == 'close_tab':
+        if len(session.tabs) < 2:
+            show_message(manager, "Last open map", notify=True)
+        elif session.map_obj.dirty:
+            manager.flow.push_confirmation("Unsaved! Close map anyway? (y/n): ", lambda confirmed: confirmed and close())
+        else:
+            close()
+    else:
+        session.switch_tab(session.active_tab + (1 if action == 'next_tab' else -1))
+        report()
+
 def handle_macro_toggle(session, manager, action=None):
     ts = session.tool_state
     if ts.recording:
@@ -502,6 +540,8 @@ def handle_open_context_menu(session, manager, action=None):
             ("Go To Coordinates", lambda: handle_goto_coords(session, manager)),
             ("Pick Tile", lambda: handle_tile_management(session, manager, 'pick_tile')),
             ("Toggle Palette", lambda: handle_toggle_palette(session, manager)),
+            ("Toggle Minimap", lambda: handle_toggle_minimap(session, manager)),
+            ("Split View", lambda: handle_split_view(session, manager)),
             ("Undo", lambda: handle_undo_redo(session, manager, 'undo')),
             ("Redo", lambda: handle_undo_redo(session, manager, 'redo')),
             ("Save Map", lambda: handle_file_ops(session, manager, 'save_map')),
@@ -511,23 +551,17 @@ def handle_open_context_menu(session, manager, action=None):
 
 def handle_zoom(session, manager, action=None):
     renderer = manager.flow.renderer
-    old_ts = renderer.tile_size
-    if action == 'zoom_in':
-        renderer.tile_size = min(100, renderer.tile_size + 2)
-    elif action == 'zoom_out':
-        renderer.tile_size = max(4, renderer.tile_size - 2)
+    direction = 1 if action == 'zoom_in' else -1 if action == 'zoom_out' else 0
     
-    if old_ts != renderer.tile_size:
-        # Recalculate view width and height based on new tile size and FIXED viewport pixel area
-        session.view_width = session.viewport_px_w // renderer.tile_size
-        session.view_height = session.viewport_px_h // renderer.tile_size
+    if direction and renderer.zoom(direction, session.map_obj, (session.viewport_px_w, session.viewport_px_h)):
+        # Recalculate view width and height based on new zoom and FIXED viewport pixel area
+        session.view_width, session.view_height = renderer.view_cells(session.viewport_px_w, session.viewport_px_h)
         
         # Ensure camera and cursor remain valid
         session.camera_x = max(0, min(session.camera_x, session.map_obj.width - session.view_width))
         session.camera_y = max(0, min(session.camera_y, session.map_obj.height - session.view_height))
         
-        renderer.invalidate_cache()
-        show_message(manager, f"Zoom: {renderer.tile_size}px", notify=True)
+        show_message(manager, f"Zoom: {renderer.zoom_label()}", notify=True)
 
 def handle_measurement_toggle(session, manager, action=None):
     session.tool_state.measurement_active = not session.tool_state.measurement_active
@@ -639,6 +673,8 @@ def get_action_dispatcher():
         'circle_tool': handle_tool_select, 'pattern_tool': handle_tool_select,
         'define_pattern': handle_define_pattern, 'define_brush': handle_define_brush,
         'toggle_snap': handle_toggle_snap, 'toggle_palette': handle_toggle_palette,
+        'toggle_minimap': handle_toggle_minimap, 'split_view': handle_split_view,
+        'toggle_profiler': handle_toggle_profiler,
         'toggle_autotile': handle_toggle_autotile,
         'resize_map': handle_resize_map, 'set_seed': handle_set_seed,
         'statistics': handle_statistics, 'show_help': handle_show_help,
@@ -646,6 +682,8 @@ def get_action_dispatcher():
         'goto_coords': handle_goto_coords,
         'save_map': handle_file_ops, 'load_map': handle_file_ops,
         'new_map': handle_file_ops, 'export_image': handle_file_ops,
+        'new_tab': handle_tabs, 'open_tab': handle_tabs, 'close_tab': handle_tabs,
+        'next_tab': handle_tabs, 'prev_tab': handle_tabs,
         'macro_record_toggle': handle_macro_toggle,
         'macro_play': handle_macro_play,
         'toggle_measurement': handle_measurement_toggle,
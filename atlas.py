@@ -0,0 +1,103 @@
+import numpy as np
+import pygame
+from tiles import REGISTRY, TABLE_SIZE
+
+# Tileset images by path, loaded once and shared by every atlas
+_SHEETS = {}
+
+def load_sheet(path):
+    """The tileset image at path, or None if it cannot be loaded."""
+    if path not in _SHEETS:
+        try:
+            _SHEETS[path] = pygame.image.load(path)
+        except (pygame.error, OSError) as e:
+            print(f"Could not load tileset {path}: {e}")
+            _SHEETS[path] = None
+    return _SHEETS[path]
+
+def sprite_region(sprite):
+    """The sprite's region of its tileset as a subsurface, or None if it is missing or out of bounds."""
+    sheet = load_sheet(sprite.image)
+    if sheet is None:
+        return None
+    rect = pygame.Rect(sprite.x, sprite.y, sprite.w, sprite.h)
+    if not sheet.get_rect().contains(rect):
+        return None
+    return sheet.subsurface(rect)
+
+def sprite_average_color(sprite):
+    region = sprite_region(sprite)
+    if region is None:
+        return None
+    return pygame.transform.average_color(region)[:3]
+
+class GlyphAtlas:
+    """Every tile glyph pre-rendered into one surface, one tile_size cell per tile.
+
+    Slot 0 is a blank (black) cell used for void and unknown ids. `slots` maps a
+    tile id to its slot, so a whole block of map data can be turned into pixels
+    with a single fancy-indexing gather, see `rasterize`.
+
+    Tiles with a sprite get their tileset region scaled to tile_size instead of
+    the char, so each zoom level's atlas holds the sprites pre-scaled for it.
+    """
+    def __init__(self, font, tile_size):
+        self.font = font
+        self.tile_size = tile_size
+        self.version = None
+        self.slots = np.zeros(TABLE_SIZE, dtype=np.uint16)
+        self.surface = None
+        self.pixels = None
+
+    def is_stale(self):
+        return self.version != REGISTRY.version
+
+    def build(self):
+        tables = REGISTRY.tables
+        ts = self.tile_size
+        ids = np.flatnonzero(tables.known)
+
+        self.slots = np.zeros(TABLE_SIZE, dtype=np.uint16)
+        self.slots[ids] = np.arange(1, len(ids) + 1, dtype=np.uint16)
+
+        surf = pygame.Surface((ts * (len(ids) + 1), ts))
+        surf.fill((0, 0, 0))
+        for slot, tid in enumerate(ids, start=1):
+            cell = pygame.Rect(slot * ts, 0, ts, ts)
+            bg = tables.bg_of(tid)
+            if bg:
+                surf.fill(bg, cell)
+            tile = REGISTRY.get(int(tid))
+            region = sprite_region(tile.sprite) if tile is not None and tile.sprite is not None else None
+            if region is not None:
+                # Nearest-neighbour keeps pixel art crisp at every zoom
+                surf.blit(pygame.transform.scale(region, (ts, ts)), cell)
+                continue
+            glyph = self.font.render(str(tables.chars[tid]), True, tables.color_of(tid))
+            # Center the glyph in its cell; anything larger than the cell is clipped
+            surf.set_clip(cell)
+            surf.blit(glyph, (cell.x + (ts - glyph.get_width()) // 2, (ts - glyph.get_height()) // 2))
+            surf.set_clip(None)
+
+        self.surface = surf
+        # Mapped pixel values in the default surface format, indexed [slot, y, x]
+        n = len(ids) + 1
+        self.pixels = pygame.surfarray.array2d(surf).reshape(n, ts, ts).transpose(0, 2, 1).copy()
+        self.version = tables.version
+
+    def slot_rect(self, tile_id):
+        ts = self.tile_size
+        return pygame.Rect(int(self.slots[tile_id]) * ts, 0, ts, ts)
+
+    def rasterize(self, data):
+        """Surface for a (h, w) block of tile ids, composed straight into its pixel memory."""
+        h, w = data.shape
+        ts = self.tile_size
+        surf = pygame.Surface((w * ts, h * ts))
+        slots = self.slots[data]
+        view = pygame.surfarray.pixels2d(surf).T  # (y, x) view of the surface memory
+        for row in range(h):
+            # Gather one row of cells (w, ts_y, ts_x) and lay it out as ts_y pixel rows
+            view[row * ts:(row + 1) * ts].reshape(ts, w, ts)[...] = self.pixels[slots[row]].transpose(1, 0, 2)
+        del view  # releases the surface lock
+        return surf
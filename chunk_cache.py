@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import numpy as np
+
+class ChunkCache:
+    """LRU cache of rendered chunk surfaces, bounded by an estimated byte budget.
+
+    Keys are tuples ending in the chunk coordinates (..., cx, cy). When over
+    budget, the victim is picked among the least recently used entries,
+    preferring the one farthest from the current focus (the chunk under the
+    camera); entries whose key prefix differs from the focus count as farthest.
+    Each entry can carry the chunk's tile presence bitmap.
+    """
+    # How many of the least recently used entries compete for eviction
+    EVICTION_WINDOW = 8
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> [surface, cost, tiles]
+        self.bytes_used = 0
+        self.focus = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def surface_cost(surf):
+        return surf.get_pitch() * surf.get_height()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        return self._entries[key][0]
+
+    def __setitem__(self, key, surf):
+        self.put(key, surf)
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, surf, tiles=None):
+        self.pop(key)
+        cost = self.surface_cost(surf)
+        self._entries[key] = [surf, cost, tiles]
+        self.bytes_used += cost
+        self._evict(protect=key)
+
+    def tiles(self, key):
+        entry = self._entries.get(key)
+        return entry[2] if entry else None
+
+    def add_tiles(self, key, tile_ids):
+        """Mark tile_ids as present in an entry after it was patched in place."""
+        entry = self._entries.get(key)
+        if entry is None or entry[2] is None:
+            return
+        top = max(tile_ids, default=-1)
+        if top >= len(entry[2]):
+            grown = np.zeros(top + 1, dtype=bool)
+            grown[:len(entry[2])] = entry[2]
+            entry[2] = grown
+        entry[2][list(tile_ids)] = True
+
+    def items_with_tiles(self):
+        return [(key, entry[2]) for key, entry in self._entries.items()]
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.bytes_used -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def set_focus(self, key):
+        self.focus = key
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries), "bytes": self.bytes_used, "budget": self.budget_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+        }
+
+    def _distance(self, key):
+        if self.focus is None:
+            return 0
+        if key[:-2] != self.focus[:-2]:
+            return float('inf')
+        return max(abs(key[-2] - self.focus[-2]), abs(key[-1] - self.focus[-1]))
+
+    def _evict(self, protect=None):
+        while self.bytes_used > self.budget_bytes and len(self._entries) > 1:
+            candidates = []
+            for key in self._entries:
+                if key != protect:
+                    candidates.append(key)
+                if len(candidates) >= self.EVICTION_WINDOW:
+                    break
+            if not candidates:
+                break
+            victim = max(candidates, key=self._distance)
+            self.pop(victim)
+            self.evictions += 1
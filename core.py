@@ -1,5 +1,6 @@
 import time
 import random
+import itertools
 import numpy as np
 from collections import deque
 from tiles import REGISTRY, TileDefinition
@@ -16,16 +17,24 @@ COLOR_MAP = {
     'white': (255, 255, 255),
 }
 
+# Source of Map.uid, which unlike id() is never reused by a later map
+_map_ids = itertools.count(1)
+
 class Map:
     def __init__(self, width, height, data=None, undo_stack=None, fill_tile_id=None):
         if fill_tile_id is None:
             fill_tile_id = REGISTRY.get_by_char('.') or 1
             
+        self.uid = next(_map_ids)
         self.width = width
         self.height = height
         self.undo_stack = undo_stack
         self.dirty = False
         self.listeners = []
+        # {tile_id: set of (x, y)} of cells holding animated tiles, see animated_cells
+        self._animated = None
+        self._animated_ids = None
+        self.animated_version = 0
         if data is not None:
             if isinstance(data, np.ndarray):
                 self.data = data.copy()
@@ -50,18 +59,70 @@ class Map:
 
     def set(self, x, y, tile_id):
         if 0 <= x < self.width and 0 <= y < self.height:
-            if self.data[y, x] != tile_id:
+            old = self.data[y, x]
+            if old != tile_id:
                 self.data[y, x] = tile_id
                 self.dirty = True
+                if self._animated is not None:
+                    self._track_animated(x, y, old, tile_id)
                 for l in self.listeners:
                     l(x, y)
                 return True
         return False
     
+    def replace_data(self, data):
+        """Swap in new map contents (undo, transforms), notifying listeners per cell when few changed."""
+        # Nested lists (the selection helpers' format) are converted like in __init__
+        data = np.asarray(data, dtype=self.data.dtype)
+        old, self.data = self.data, data
+        self.dirty = True
+        if old.shape != data.shape:
+            self._animated = None
+            self.height, self.width = data.shape
+            self.trigger_full_update()
+            return
+        ys, xs = np.nonzero(old != data)
+        if len(xs) > 4096:
+            self.trigger_full_update()
+            return
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            if self._animated is not None:
+                self._track_animated(x, y, old[y, x], data[y, x])
+            for l in self.listeners:
+                l(x, y)
+
     def trigger_full_update(self):
+        # Whole-map writes bypass set(), so the animated cell index is rebuilt on next use
+        self._animated = None
         for l in self.listeners:
             l(None, None) # Special case for full redraw
 
+    def animated_cells(self):
+        """{tile_id: set of (x, y)} for every animated tile on the map.
+
+        Built with one vectorized scan on first use or after the registry's set of
+        animated tiles changes, then kept current by set and replace_data.
+        """
+        tables = REGISTRY.tables
+        if self._animated is None or self._animated_ids != tables.animated_ids:
+            self._animated = {}
+            if tables.animated_ids:
+                ys, xs = np.nonzero(tables.animated[self.data])
+                for x, y, tid in zip(xs.tolist(), ys.tolist(), self.data[ys, xs].tolist()):
+                    self._animated.setdefault(tid, set()).add((x, y))
+            self._animated_ids = tables.animated_ids
+            self.animated_version += 1
+        return self._animated
+
+    def _track_animated(self, x, y, old, new):
+        animated = REGISTRY.tables.animated
+        if animated[old]:
+            self._animated.get(int(old), set()).discard((x, y))
+        if animated[new]:
+            self._animated.setdefault(int(new), set()).add((x, y))
+        if animated[old] or animated[new]:
+            self.animated_version += 1
+
     def push_undo(self):
         if self.undo_stack:
             self.undo_stack.push(self.data.copy())
@@ -123,6 +184,8 @@ class ToolState:
             'points': [] # List of (x, y)
         }
         self.show_palette = False
+        self.show_minimap = False
+        self.split_views = 1
         self.auto_tiling = False
         self.tiling_rules = tiling_rules if tiling_rules is not None else {}
         self.autosave_enabled = False
@@ -135,8 +198,38 @@ class ToolState:
         if self.seed is not None:
             random.seed(self.seed)
 
+class MapTab:
+    """A map open in the editor, with the view and edit state it had when last active.
+
+    The session holds the active tab's state; `save` copies it into the tab
+    and `load` puts it back. Tool settings and the clipboard are shared by all
+    tabs, which is what makes copy and paste work across maps.
+    """
+    # map_obj last, so the session is consistent when its map watchers run
+    ATTRS = ('undo_stack', 'camera_x', 'camera_y', 'cursor_x', 'cursor_y',
+             'selection_start', 'selection_end', 'map_obj')
+
+    def __init__(self, map_obj):
+        if map_obj.undo_stack is None:
+            map_obj.undo_stack = UndoStack()
+        self.state = dict(map_obj=map_obj, undo_stack=map_obj.undo_stack, camera_x=0, camera_y=0,
+                          cursor_x=0, cursor_y=0, selection_start=None, selection_end=None)
+
+    @property
+    def map_obj(self):
+        return self.state['map_obj']
+
+    def save(self, session):
+        self.state = {name: getattr(session, name) for name in self.ATTRS}
+
+    def load(self, session):
+        for name in self.ATTRS:
+            setattr(session, name, self.state[name])
+
 class EditorSession:
     def __init__(self, map_obj, view_width, view_height, bindings, macros=None, tiling_rules=None):
+        # Called with the new map whenever map_obj is replaced: tab switches, load, new map, rotate
+        self.map_watchers = []
         self.map_obj = map_obj
         self.view_width = view_width
         self.view_height = view_height
@@ -166,6 +259,47 @@ class EditorSession:
         self.action_queue = deque()
         self.status_y = 0
 
+        self.tabs = [MapTab(map_obj)]
+        self.active_tab = 0
+
+    @property
+    def map_obj(self):
+        return self._map_obj
+
+    @map_obj.setter
+    def map_obj(self, map_obj):
+        self._map_obj = map_obj
+        for watcher in self.map_watchers:
+            watcher(map_obj)
+
+    def open_tab(self, map_obj):
+        """Open map_obj in a new tab after the others and switch to it."""
+        self.tabs.append(MapTab(map_obj))
+        self.switch_tab(len(self.tabs) - 1)
+
+    def switch_tab(self, index):
+        index %= len(self.tabs)
+        if index == self.active_tab:
+            return
+        self.tabs[self.active_tab].save(self)
+        self.active_tab = index
+        self.tabs[index].load(self)
+
+    def close_tab(self):
+        """Close the active tab and switch to its neighbour. Returns the closed map, or None for the last tab."""
+        if len(self.tabs) < 2:
+            return None
+        closed = self.tabs.pop(self.active_tab)
+        self.active_tab = min(self.active_tab, len(self.tabs) - 1)
+        self.tabs[self.active_tab].load(self)
+        return closed.map_obj
+
+    def open_maps(self):
+        """The maps of every tab; the active tab's may have been replaced since it was saved."""
+        maps = [tab.map_obj for tab in self.tabs]
+        maps[self.active_tab] = self.map_obj
+        return maps
+
     def draw_long_line(self, direction, x, y):
         """Draws a line of the selected tile across the entire map."""
         self.map_obj.push_undo()
@@ -57,7 +57,32 @@ def flood_fill(map_obj, x, y, new_tile_id):
                     visited.add((nx, ny))
                     queue.append((nx, ny))
 
-def get_line_points(x0, y0, x1, y1):
+def _segment_hits_box(x0, y0, x1, y1, clip):
+    """Liang-Barsky test: does the segment pass through the inclusive cell box clip?"""
+    cx0, cy0, cx1, cy1 = clip
+    t0, t1 = 0.0, 1.0
+    dx, dy = x1 - x0, y1 - y0
+    for p, q in ((-dx, x0 - (cx0 - 0.5)), (dx, (cx1 + 0.5) - x0), (-dy, y0 - (cy0 - 0.5)), (dy, (cy1 + 0.5) - y0)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return False
+    return True
+
+def _in_box(x, y, clip):
+    return clip[0] <= x <= clip[2] and clip[1] <= y <= clip[3]
+
+def get_line_points(x0, y0, x1, y1, clip=None):
+    """Bresenham line points; with clip=(x0, y0, x1, y1) only the points inside that inclusive box."""
+    if clip is not None and not _segment_hits_box(x0, y0, x1, y1, clip):
+        return []
     points = []
     dx = abs(x1 - x0)
     dy = abs(y1 - y0)
@@ -67,7 +92,8 @@ def get_line_points(x0, y0, x1, y1):
 
     x, y = x0, y0
     while True:
-        points.append((x, y))
+        if clip is None or _in_box(x, y, clip):
+            points.append((x, y))
         if x == x1 and y == y1: break
         e2 = 2 * err
         if e2 > -dy:
@@ -82,11 +108,26 @@ def draw_line(map_obj, x0, y0, x1, y1, tile_id, brush_size=1, brush_shape=None,
     for x, y in get_line_points(x0, y0, x1, y1):
         place_tile_at(map_obj, x, y, tile_id, brush_size, brush_shape, tool_state)
 
-def get_rect_points(x0, y0, x1, y1, filled=False):
+def get_rect_points(x0, y0, x1, y1, filled=False, clip=None):
     points = []
     min_x, max_x = (x0, x1) if x0 < x1 else (x1, x0)
     min_y, max_y = (y0, y1) if y0 < y1 else (y1, y0)
 
+    if clip is not None:
+        # Walk only the parts of the edges that fall inside the clip box
+        cx0, cy0, cx1, cy1 = clip
+        xs = range(max(min_x, cx0), min(max_x, cx1) + 1)
+        ys = range(max(min_y, cy0), min(max_y, cy1) + 1)
+        if filled:
+            return [(x, y) for y in ys for x in xs]
+        for y in {min_y, max_y}:
+            if cy0 <= y <= cy1:
+                points.extend((x, y) for x in xs)
+        for x in {min_x, max_x}:
+            if cx0 <= x <= cx1:
+                points.extend((x, y) for y in ys if min_y < y < max_y)
+        return points
+
     if filled:
         for y in range(min_y, max_y + 1):
             for x in range(min_x, max_x + 1):
@@ -114,14 +155,27 @@ def draw_rectangle(map_obj, x0, y0, x1, y1, tile_id, filled, brush_size=1, brush
         for x, y in get_rect_points(x0, y0, x1, y1, filled=False):
             place_tile_at(map_obj, x, y, tile_id, brush_size, brush_shape, tool_state)
 
-def get_circle_points(cx, cy, radius, filled=False):
+def get_circle_points(cx, cy, radius, filled=False, clip=None):
     points = []
+    if clip is not None:
+        bx0, by0, bx1, by1 = clip
+        if cx + radius < bx0 or cx - radius > bx1 or cy + radius < by0 or cy - radius > by1:
+            return []
+        if not filled:
+            # Outline cannot be visible if the whole clip box lies well inside the circle
+            far = max((x - cx) ** 2 + (y - cy) ** 2 for x in (bx0, bx1) for y in (by0, by1))
+            if far < (radius - 1) ** 2:
+                return []
     if filled:
         # Note: Filled circle usually handled by mask optimization in main draw,
         # but for preview we might need points. However, user asked for hollow preview.
         # We'll implement a basic filled circle point generator just in case.
-        for y in range(cy - radius, cy + radius + 1):
-            for x in range(cx - radius, cx + radius + 1):
+        x_lo, x_hi, y_lo, y_hi = cx - radius, cx + radius, cy - radius, cy + radius
+        if clip is not None:
+            x_lo, x_hi = max(x_lo, clip[0]), min(x_hi, clip[2])
+            y_lo, y_hi = max(y_lo, clip[1]), min(y_hi, clip[3])
+        for y in range(y_lo, y_hi + 1):
+            for x in range(x_lo, x_hi + 1):
                 if (x - cx)**2 + (y - cy)**2 <= radius**2:
                     points.append((x, y))
     else:
@@ -134,7 +188,10 @@ def get_circle_points(cx, cy, radius, filled=False):
                 (cx - x, cy - y), (cx - y, cy - x),
                 (cx + y, cy - x), (cx + x, cy - y)
             ]
-            points.extend(p)
+            if clip is None:
+                points.extend(p)
+            else:
+                points.extend(q for q in p if _in_box(q[0], q[1], clip))
 
             y += 1
             if err <= 0:
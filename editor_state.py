@@ -1,11 +1,16 @@
+import time
 import pygame
 from state_engine import State
 from controller import InputHandler
 from view import Renderer
+from viewport import SplitView
 from core import EditorSession
 from tiles import REGISTRY
 
 class EditorState(State):
+    partial_motion_redraw = True
+    opaque = True
+
     def __init__(self, manager, session: EditorSession, renderer: Renderer):
         super().__init__(manager)
         self.session = session
@@ -16,25 +21,91 @@ class EditorState(State):
         # Set initial fixed pixel dimensions
         self.session.viewport_px_w = self.renderer.width
         self.session.viewport_px_h = self.renderer.height - 120
+        self.views = SplitView(session, renderer, (0, 0, self.session.viewport_px_w, self.session.viewport_px_h))
         
         self.palette_rects = None
+        self.minimap_rect = None
+        self.minimap_drag = False
+        # When the redraw for the next animation frame is due, see draw
+        self.animation_due = 0.0
         
         self.panning = False
         self.pan_start_pos = (0, 0)
         self.pan_start_cam = (0, 0)
         
-        # Register map listener
+        # Register map listener, and move it along when the session's map is replaced
         self._register_map_listener()
+        self.session.map_watchers.append(self._on_map_replaced)
 
     def _register_map_listener(self):
-        # Remove from old map if needed (though session usually has one map)
-        self.session.map_obj.listeners.append(self._on_map_change)
+        self.map_obj = self.session.map_obj
+        self.map_obj.listeners.append(self._on_map_change)
+        self.renderer.set_map(self.map_obj)
+
+    def _on_map_replaced(self, map_obj):
+        """Follow session.map_obj to a new map: a tab switch, or a load, new map or rotate that replaced it."""
+        old = self.map_obj
+        if map_obj is old:
+            return
+        if self._on_map_change in old.listeners:
+            old.listeners.remove(self._on_map_change)
+        if not any(m is old for m in self.session.open_maps()):
+            # Replaced rather than switched away from: its cached chunks are of no further use
+            self.renderer.forget_map(old.uid)
+        if self.session.map_obj.undo_stack is None:
+            self.session.map_obj.undo_stack = self.session.undo_stack
+        self._register_map_listener()
+        self.mark_dirty()
 
     def _on_map_change(self, x, y):
         if x is None or y is None:
-            self.renderer.invalidate_cache()
+            # Other open maps keep their chunks
+            self.renderer.forget_map(self.map_obj.uid)
         else:
-            self.renderer.invalidate_chunk(x, y)
+            self.renderer.queue_cell(x, y)
+        self.mark_dirty()
+
+    def needs_update(self):
+        # Held buttons paint, macros drain the action queue, progressive chunk builds need more frames,
+        # the prefetcher keeps working until the ring around the view is built and reduced quality
+        # is given the frames to step back up
+        return (any(pygame.mouse.get_pressed()) or bool(self.session.action_queue)
+                or self.renderer.pending_chunks > 0 or self.renderer.prefetcher.pending()
+                or self.renderer.quality_settling())
+
+    def _over_overlay(self, pos):
+        """Whether pos is over the palette or the minimap rather than the map."""
+        if self.session.tool_state.show_palette and self.palette_rects and self.palette_rects[0].collidepoint(pos):
+            return True
+        return bool(self.session.tool_state.show_minimap and self.minimap_rect and self.minimap_rect.collidepoint(pos))
+
+    def _center_on_minimap(self, pos):
+        s = self.session
+        x, y = self.renderer.minimap.cell_at(self.minimap_rect, pos)
+        s.camera_x = max(0, min(s.map_obj.width - s.view_width, x - s.view_width // 2))
+        s.camera_y = max(0, min(s.map_obj.height - s.view_height, y - s.view_height // 2))
+        self.mark_dirty()
+
+    def _sync_views(self):
+        if self.session.tool_state.split_views != len(self.views.views):
+            self.views.set_count(self.session.tool_state.split_views)
+            self.session.tool_state.split_views = len(self.views.views)
+            self.mark_dirty()
+
+    def _mark_cursor_dirty(self, old_cursor):
+        """Redraw only what a plain cursor move changes: the brush ghost at both ends and the status bar."""
+        ts = self.session.tool_state
+        if self.views.split:
+            # The cursor shows in every view
+            self.mark_dirty()
+            return
+        if ts.start_point or ts.measurement_active or (self.session.selection_start and not self.session.selection_end):
+            self.mark_dirty()
+            return
+        br = ts.brush_size
+        for cx, cy in (old_cursor, (self.session.cursor_x, self.session.cursor_y)):
+            self.mark_dirty(self.renderer.cell_rect(self.session, cx - br // 2, cy - br // 2, br, br).inflate(4, 4))
+        self.mark_dirty(self.renderer.status_rect(self.session))
 
     def enter(self, **kwargs):
         # We could show a "Toast" message here or something
@@ -49,32 +120,46 @@ class EditorState(State):
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 2:
                 self.panning = False
+            elif event.button == 1:
+                self.minimap_drag = False
 
         elif event.type == pygame.MOUSEMOTION:
             mx, my = event.pos
+            old_cursor = (self.session.cursor_x, self.session.cursor_y)
+            if self.views.split and not (self.panning or self.minimap_drag or any(event.buttons) or self._over_overlay(event.pos)):
+                # Keyboard and wheel act on the view under the mouse
+                if self.views.focus(self.views.view_at(event.pos)):
+                    self.mark_dirty()
             
             if self.panning:
-                tile_size = self.renderer.tile_size
-                dx = (mx - self.pan_start_pos[0]) // tile_size
-                dy = (my - self.pan_start_pos[1]) // tile_size
+                self.mark_dirty()
+                dx = self.renderer.px_to_cell(mx - self.pan_start_pos[0])
+                dy = self.renderer.px_to_cell(my - self.pan_start_pos[1])
                 
                 self.session.camera_x = max(0, min(self.session.map_obj.width - self.session.view_width, self.pan_start_cam[0] - dx))
                 self.session.camera_y = max(0, min(self.session.map_obj.height - self.session.view_height, self.pan_start_cam[1] - dy))
+            elif self.minimap_drag and self.minimap_rect:
+                self._center_on_minimap(pygame.Rect(mx, my, 1, 1).clamp(self.minimap_rect).topleft)
 
-            # Only update map cursor if mouse is within the viewport (above status bar)
-            if my < self.session.viewport_px_h:
-                if self.session.tool_state.show_palette and self.palette_rects and self.palette_rects[0].collidepoint(mx, my):
+            # Only update map cursor if mouse is within the active view (above status bar)
+            if self.views.active_rect().collidepoint(mx, my):
+                if self.minimap_drag or self._over_overlay((mx, my)):
                     pass
                 else:
-                    tile_size = self.renderer.tile_size
-                    map_x = (mx // tile_size) + self.session.camera_x
-                    map_y = (my // tile_size) + self.session.camera_y
+                    lx, ly = self.views.to_local(event.pos)
+                    map_x = self.renderer.px_to_cell(lx) + self.session.camera_x
+                    map_y = self.renderer.px_to_cell(ly) + self.session.camera_y
                     
                     if 0 <= map_x < self.session.map_obj.width and 0 <= map_y < self.session.map_obj.height:
                         self.session.cursor_x = map_x
                         self.session.cursor_y = map_y
 
+            if old_cursor != (self.session.cursor_x, self.session.cursor_y):
+                self._mark_cursor_dirty(old_cursor)
+
         elif event.type == pygame.MOUSEBUTTONDOWN:
+            if self.views.split and not self._over_overlay(event.pos) and self.views.focus(self.views.view_at(event.pos)):
+                self.mark_dirty()
             if event.button == 2: # Middle Click Panning
                 self.panning = True
                 self.pan_start_pos = event.pos
@@ -85,7 +170,12 @@ class EditorState(State):
             handled = False
             if self.session.tool_state.show_palette and self.palette_rects:
                 main_rect, clickables = self.palette_rects
-                if main_rect.collidepoint(event.pos):
+                if main_rect.collidepoint(event.pos) and event.button in (4, 5):
+                    # Wheel scrolls the palette instead of zooming the map
+                    self.renderer.palette.scroll_by(-1 if event.button == 4 else 1, self.renderer.palette_layout()[2])
+                    self.mark_dirty()
+                    handled = True
+                elif main_rect.collidepoint(event.pos):
                     # Check if clicked a specific tile
                     for r, tid in clickables:
                         if r.collidepoint(event.pos):
@@ -93,6 +183,13 @@ class EditorState(State):
                             break
                     handled = True
 
+            if not handled and self.session.tool_state.show_minimap and self.minimap_rect and self.minimap_rect.collidepoint(event.pos):
+                # Click or drag on the minimap recentres the view there
+                if event.button == 1:
+                    self.minimap_drag = True
+                    self._center_on_minimap(event.pos)
+                handled = True
+
             if not handled:
                 # Dispatch mouse button press as an action
                 # event.button is 1 (left), 2 (middle), 3 (right), 4 (scroll up), 5 (scroll down)
@@ -100,21 +197,25 @@ class EditorState(State):
 
         elif event.type == pygame.VIDEORESIZE:
             self.renderer.update_dimensions()
-            self.session.viewport_px_w = self.renderer.width
-            self.session.viewport_px_h = self.renderer.height - 120
-            
-            # Update tile counts based on new pixel area
-            self.session.view_width = self.session.viewport_px_w // self.renderer.tile_size
-            self.session.view_height = self.session.viewport_px_h // self.renderer.tile_size
+            # Sizes the views and updates the active one's tile counts
+            self.views.layout((0, 0, self.renderer.width, self.renderer.height - 120))
 
 
     def update(self, dt):
         # Sync keys to prevent stuck inputs after modal dialogs
         self.input_handler.check_held_keys()
+        self._sync_views()
+        if self.renderer.pending_chunks:
+            self.mark_dirty()
+        elif self.renderer.prefetcher.pending():
+            self.renderer.prefetcher.run(self.session, self.renderer.prefetch_budget_ms)
+        elif self.renderer.quality_settling():
+            # note_frame only runs on drawn frames; these measure the headroom once the view is built
+            self.mark_dirty()
         
         # Support continuous mouse painting (hold to paint)
         mx, my = pygame.mouse.get_pos()
-        if not (self.session.tool_state.show_palette and self.palette_rects and self.palette_rects[0].collidepoint(mx, my)):
+        if not (self.minimap_drag or self._over_overlay((mx, my))):
              self.input_handler.handle_mouse_hold(self.manager)
 
         if not self.session.running:
@@ -125,10 +226,28 @@ class EditorState(State):
         if self.session.action_queue:
             action = self.session.action_queue.popleft()
             self.input_handler.dispatch(action, self.manager)
+            self.mark_dirty()
             
     def draw(self, surface):
+        start = time.perf_counter()
+        self._sync_views()
         self.renderer.clear()
-        self.renderer.draw_map(self.session)
+        self.views.draw(self.renderer.screen)
+        profiler = self.renderer.profiler
         self.renderer.draw_status(self.session)
+        profiler.lap('status')
+        self.minimap_rect = self.renderer.draw_minimap(self.session, self.views.area.bottom)
+        profiler.lap('overlays')
         self.palette_rects = self.renderer.draw_palette(self.session)
+        profiler.lap('palette')
         # Note: We don't flip here, the StateManager does
+        self.renderer.note_frame((time.perf_counter() - start) * 1000)
+
+        # Wake up for the next frame of visible animated tiles, unless that redraw is already scheduled
+        delay = self.renderer.next_animation
+        if delay is not None:
+            now = time.time()
+            due = now + delay
+            if not now < self.animation_due <= due:
+                self.manager.schedule_redraw(delay, self.views.area)
+                self.animation_due = due
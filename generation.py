@@ -1,7 +1,8 @@
 import numpy as np
-import tcod
 import random
-from scipy.signal import convolve2d
+
+# scipy and tcod are imported inside the generators that use them; they dominate
+# startup time otherwise.
 
 def cellular_automata_cave(map_obj, iterations=5, wall_id=1, floor_id=0,
                            seed=None, use_dual_rule=True, verbose=False):
@@ -9,6 +10,7 @@ def cellular_automata_cave(map_obj, iterations=5, wall_id=1, floor_id=0,
     Generate a cave map using cellular automata.
     wall_id, floor_id : int (Tile IDs)
     """
+    from scipy.signal import convolve2d
     if seed is None:
         seed = random.randint(0, 999999)
 
@@ -66,6 +68,7 @@ def perlin_noise_generation(map_obj, tile_ids, scale=10.0, octaves=4,
     """
     Generate terrain using Perlin noise (FBM).
     """
+    import tcod
     if seed is None:
         seed = random.randint(0, 999999)
 
@@ -137,6 +140,7 @@ def apply_cellular_automata_region(map_obj, x_range, y_range, target_tiles, floo
     Apply CA to a specific region of the map.
     mode: 'classic' (random init) or 'existing' (use current map)
     """
+    from scipy.signal import convolve2d
     x0, x1 = x_range
     y0, y1 = y_range
     w = x1 - x0
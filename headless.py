@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import pygame
+from view import Renderer
+from tiles import init_default_tiles
+
+# Pixels per cell when no tile size is given, the editor's starting zoom
+DEFAULT_TILE_SIZE = 20
+
+def init_renderer(tile_size=DEFAULT_TILE_SIZE):
+    """Set up pygame without a window and return a Renderer for offscreen rendering.
+
+    Uses SDL's dummy video driver unless SDL_VIDEODRIVER is already set; the
+    1x1 display only exists so surfaces can be converted to its pixel format.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    init_default_tiles()
+    screen = pygame.display.set_mode((1, 1))
+    return Renderer(screen, tile_size)
+
+def set_zoom(renderer, tile_size=None, mip=1, fit=None, size=None):
+    """Set the renderer's zoom: tile_size (default DEFAULT_TILE_SIZE) pixels per cell, or 1 pixel per mip x mip cells.
+
+    With fit, zoom out from there until size (w, h) in cells fits in fit x fit pixels. The zoom
+    of earlier calls is not kept, so each file of a batch gets the same starting point.
+    """
+    renderer.tile_size = max(1, DEFAULT_TILE_SIZE if tile_size is None else tile_size)
+    renderer.mip = max(1, min(Renderer.MAX_MIP, mip))
+    if renderer.mip > 1:
+        renderer.tile_size = 1
+    if fit is None or size is None:
+        return
+    longest = max(1, *size)
+    if renderer.cell_to_px(longest) > fit:
+        renderer.tile_size = max(1, fit // longest)
+    while renderer.cell_to_px(longest) > fit and renderer.mip < Renderer.MAX_MIP:
+        renderer.mip *= 2
+
+def render_map(renderer, map_obj, region=None):
+    """Render region (x, y, w, h) of map_obj, or the whole map, at the renderer's zoom."""
+    x, y, w, h = region or (0, 0, map_obj.width, map_obj.height)
+    return renderer.render_region(map_obj, x, y, w, h)
+
+def render_file(renderer, filename, output, region=None, tile_size=None, fit=None):
+    """Load a text map, render it and save the image to output. Returns the surface."""
+    from map_io import load_map
+    map_obj = load_map(filename)
+    if map_obj is None:
+        raise ValueError(f"{filename} is empty")
+    set_zoom(renderer, tile_size, fit=fit, size=region[2:] if region else (map_obj.width, map_obj.height))
+    surf = render_map(renderer, map_obj, region)
+    pygame.image.save(surf, output)
+    return surf
+
+def bench(renderer, map_obj, region=None, runs=5):
+    """Time render_map with a cold chunk cache, then warm. Returns (cold_ms, best_warm_ms)."""
+    renderer.forget_map(map_obj.uid)
+    start = time.perf_counter()
+    render_map(renderer, map_obj, region)
+    cold = (time.perf_counter() - start) * 1000
+    warm = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render_map(renderer, map_obj, region)
+        warm.append((time.perf_counter() - start) * 1000)
+    return cold, min(warm)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Render text maps to images without opening a window")
+    parser.add_argument('maps', nargs='+', help="text map files, as saved by the editor")
+    parser.add_argument('-o', '--output-dir', default='.', help="directory for the images (default: current)")
+    parser.add_argument('--format', default='png', help="image file extension (default: png)")
+    parser.add_argument('--region', default=None, metavar='X,Y,W,H', help="render only these cells")
+    parser.add_argument('--tile-size', type=int, default=None, metavar='PX', help=f"pixels per cell (default: {DEFAULT_TILE_SIZE})")
+    parser.add_argument('--fit', type=int, default=None, metavar='PX', help="zoom out until the image fits in PX x PX")
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help="also time N warm renders after the cold one")
+    args = parser.parse_args(argv)
+
+    region = tuple(int(v) for v in args.region.split(',')) if args.region else None
+    if region is not None and len(region) != 4:
+        parser.error("--region takes X,Y,W,H")
+
+    renderer = init_renderer()
+    os.makedirs(args.output_dir, exist_ok=True)
+    status = 0
+    for filename in args.maps:
+        base = os.path.splitext(os.path.basename(filename))[0]
+        output = os.path.join(args.output_dir, f"{base}.{args.format}")
+        try:
+            surf = render_file(renderer, filename, output, region, args.tile_size, args.fit)
+        except (OSError, ValueError, pygame.error) as e:
+            print(f"{filename}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        w, h = surf.get_size()
+        line = f"{output}: {w}x{h} at {renderer.zoom_label()}"
+        if args.bench:
+            cold, warm = bench(renderer, renderer.map_obj, region, args.bench)
+            line += f", cold {cold:.1f} ms, warm {warm:.1f} ms"
+        print(line)
+        # A batch renders each map once; free its chunks before the next one
+        renderer.forget_map(renderer.map_key)
+    pygame.quit()
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
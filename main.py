@@ -1,3 +1,4 @@
+import os
 import sys
 import pygame
 from view import Renderer
@@ -30,5 +31,58 @@ def main():
     # 5. Run loop
     state_manager.run(renderer)
 
+# Must not be imported before the first frame; they are loaded on first use
+LAZY_MODULES = ('scipy', 'tcod', 'PIL', 'generation', 'menu.generation')
+
+def import_report(budget_ms=None, top=20):
+    """Print a per-package breakdown of a cold `import main` (via -X importtime).
+
+    Returns a process exit code: 1 if a LAZY_MODULES entry was imported eagerly
+    or the total exceeds budget_ms, so it can guard startup time in CI.
+    """
+    import subprocess
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+
+    self_us = {}
+    loaded = set()
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        loaded.add(name)
+        package = name.split('.')[0]
+        self_us[package] = self_us.get(package, 0) + int(own)
+        if name == 'main':
+            total_us = int(cumulative)
+
+    print(f"{'module':<30} {'self ms':>10}")
+    for package, us in sorted(self_us.items(), key=lambda x: x[1], reverse=True)[:top]:
+        print(f"{package:<30} {us / 1000:>10.1f}")
+    print(f"{'TOTAL (import main)':<30} {total_us / 1000:>10.1f}")
+
+    status = 0
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        status = 1
+    if budget_ms is not None and total_us / 1000 > budget_ms:
+        print(f"FAIL: startup imports took {total_us / 1000:.1f} ms, budget is {budget_ms} ms")
+        status = 1
+    return status
+
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Advanced Map Editor")
+    parser.add_argument('--import-report', action='store_true', help="print a per-module import time breakdown and exit")
+    parser.add_argument('--import-budget', type=float, default=None, metavar='MS', help="with --import-report, fail if startup imports exceed MS")
+    args = parser.parse_args()
+
+    if args.import_report:
+        sys.exit(import_report(args.import_budget))
     main()
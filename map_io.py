@@ -3,7 +3,6 @@ import json
 import pygame
 import numpy as np
 from tiles import REGISTRY
-from core import COLOR_MAP
 
 def load_config():
     config_path = os.path.join(os.getcwd(), 'map_editor_config.json')
@@ -35,6 +34,11 @@ def load_config():
         'editor_menu': 'f1',
         'toggle_snap': 'G', 'set_measure': 'N',
         'toggle_palette': 'tab',
+        'toggle_minimap': 'f3',
+        'split_view': 'f4',
+        'toggle_profiler': 'f5',
+        'new_tab': 'ctrl n', 'open_tab': 'ctrl l', 'close_tab': 'ctrl w',
+        'next_tab': 'ctrl tab', 'prev_tab': 'shift ctrl tab',
         'toggle_autotile': 'A',
         'zoom_in': ['=', 'mouse 4'], 'zoom_out': ['-', 'mouse 5'],
         'open_context_menu': 'mouse 3',
@@ -62,15 +66,16 @@ def save_config(bindings):
             json.dump(bindings, f, indent=2)
     except: pass
 
-def load_tiles():
+def load_tiles_raw():
+    """Raw bytes of custom_tiles.json (or None), for validating straight from JSON."""
     tiles_path = os.path.join(os.getcwd(), 'custom_tiles.json')
     if not os.path.exists(tiles_path):
-        return []
+        return None
     try:
-        with open(tiles_path, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+        with open(tiles_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
 
 def save_tiles(tile_definitions):
     tiles_path = os.path.join(os.getcwd(), 'custom_tiles.json')
@@ -85,20 +90,8 @@ def export_to_image(map_data, _tile_colors, filename, tile_size=8):
     from PIL import Image
     height, width = map_data.shape
 
-    rgb_map = np.zeros((height, width, 3), dtype=np.uint8)
-    
-    unique_ids = np.unique(map_data)
-    for tid in unique_ids:
-        tile = REGISTRY.get(tid)
-        color = (0, 0, 0)
-        if tile:
-            c = tile.color
-            if isinstance(c, str):
-                color = COLOR_MAP.get(c.lower(), (255, 255, 255))
-            else:
-                color = c
-        
-        rgb_map[map_data == tid] = color
+    # Unknown ids map to black in the compiled color table
+    rgb_map = REGISTRY.tables.fg[map_data]
 
     img = Image.fromarray(rgb_map, 'RGB')
     if tile_size != 1:
@@ -106,15 +99,36 @@ def export_to_image(map_data, _tile_colors, filename, tile_size=8):
     
     img.save(filename)
 
+def load_map(filename, min_width=0, min_height=0):
+    """Read a text map (one tile character per cell, as autosave_map writes) into a Map.
+
+    The map is at least min_width x min_height; cells past the end of short rows or of the
+    file keep the default fill tile and unknown characters become tile 0. Returns None for an empty file.
+    """
+    from core import Map
+    with open(filename, "r") as f:
+        lines = [line.rstrip("\n") for line in f]
+    if not lines:
+        return None
+    file_w = max(len(l) for l in lines)
+    m = Map(max(file_w, min_width), max(len(lines), min_height))
+    if file_w:
+        # Fixed-width strings viewed as single chars; the padding of short rows reads as ''
+        chars = np.array(lines, dtype=f'<U{file_w}').view('<U1').reshape(len(lines), file_w)
+        uniq, inverse = np.unique(chars, return_inverse=True)
+        ids = np.array([REGISTRY.get_by_char(c) if c else -1 for c in uniq])[inverse.reshape(chars.shape)]
+        region = m.data[:len(lines), :file_w]
+        region[ids >= 0] = ids[ids >= 0]
+    return m
+
 def autosave_map(map_obj, filename):
     try:
+        chars = np.ascontiguousarray(REGISTRY.tables.chars[map_obj.data])
+        # View each row of single chars as one fixed-width string
+        rows = chars.view(f'<U{map_obj.width}')[:, 0]
         with open(filename, 'w') as f:
-            for row in map_obj.data:
-                line_chars = []
-                for tid in row:
-                    t = REGISTRY.get(tid)
-                    line_chars.append(t.char if t else ' ')
-                f.write(''.join(line_chars) + '\n')
+            for row in rows:
+                f.write(row + '\n')
         return True
     except:
         return False
@@ -1,12 +1,29 @@
 from menu.base import (
     build_key_map, get_map_statistics, _render_menu_generic, 
-    FormState, TextInputState, ConfirmationState, MessageState, HelpState
+    FormState, TextInputState, ConfirmationState, MessageState, HelpState, Panel
 )
-from menu.pickers import ColorPickerState, TilePickerState
-from menu.map_ops import NewMapState, LoadMapState, ExportMapState, menu_save_map, menu_resize_map
-from menu.generation import menu_random_generation, menu_perlin_generation, menu_voronoi_generation
-from menu.registry import TileRegistryState
-from menu.settings import ControlSettingsState, menu_autosave_settings
-from menu.managers import MacroManagerState, AutoTilingManagerState
-from menu.tools import menu_define_brush, menu_define_pattern, BrushDefineState, PatternDefineState
-from menu.editor import menu_statistics, menu_editor_pause
+
+# Submodules are imported on first attribute access so that startup does not pay
+# for generation (scipy, tcod) or export code until a menu actually needs it.
+_LAZY_EXPORTS = {
+    'ColorPickerState': 'menu.pickers', 'TilePickerState': 'menu.pickers',
+    'NewMapState': 'menu.map_ops', 'LoadMapState': 'menu.map_ops', 'ExportMapState': 'menu.map_ops',
+    'menu_save_map': 'menu.map_ops', 'menu_resize_map': 'menu.map_ops',
+    'menu_random_generation': 'menu.generation', 'menu_perlin_generation': 'menu.generation',
+    'menu_voronoi_generation': 'menu.generation',
+    'TileRegistryState': 'menu.registry',
+    'ControlSettingsState': 'menu.settings', 'menu_autosave_settings': 'menu.settings',
+    'MacroManagerState': 'menu.managers', 'AutoTilingManagerState': 'menu.managers',
+    'menu_define_brush': 'menu.tools', 'menu_define_pattern': 'menu.tools',
+    'BrushDefineState': 'menu.tools', 'PatternDefineState': 'menu.tools',
+    'menu_statistics': 'menu.editor', 'menu_editor_pause': 'menu.editor',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'menu' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -1,4 +1,4 @@
-from collections import Counter
+from collections import Counter, OrderedDict
 import pygame
 from state_engine import State
 from utils import get_key_name
@@ -30,8 +30,61 @@ def build_key_map(bindings):
 def get_map_statistics(map_obj):
     return Counter(map_obj.data.flatten())
 
+class Panel:
+    """Retained-mode menu panel.
+
+    The background and border are drawn once into a cached surface, rebuilt
+    only when the layout key passed to `begin` changes. Each `row` owns a
+    band of the panel and is repainted, clipped to that band, only when its
+    content differs from the previous frame. `blit` then puts the whole panel
+    on screen in one call.
+    """
+    def __init__(self, bg, border=None, border_width=2):
+        self.bg = bg
+        self.border = border
+        self.border_width = border_width
+        self.surface = None
+        self.key = None
+        self.rows = {}
+
+    def begin(self, key, size):
+        """Returns True if the panel was rebuilt, so fixed decorations have to be drawn again."""
+        key = (key, tuple(size))
+        if self.surface is not None and key == self.key:
+            return False
+        # Opaque panels skip per-pixel alpha, which makes the final blit a plain copy
+        translucent = len(self.bg) > 3 and self.bg[3] < 255
+        self.surface = pygame.Surface(size, pygame.SRCALPHA if translucent else 0)
+        self.surface.fill(self.bg)
+        if self.border:
+            pygame.draw.rect(self.surface, self.border, self.surface.get_rect(), self.border_width)
+        self.key = key
+        self.rows = {}
+        return True
+
+    def row(self, key, band, content, paint):
+        """Repaint the band with paint(surface, band) unless content is unchanged since the last frame."""
+        band = pygame.Rect(band)
+        if self.rows.get(key) == (tuple(band), content):
+            return False
+        inner = self.surface.get_rect()
+        if self.border:
+            inner.inflate_ip(-2 * self.border_width, -2 * self.border_width)
+        self.surface.set_clip(band.clip(inner))
+        self.surface.fill(self.bg)
+        paint(self.surface, band)
+        self.surface.set_clip(None)
+        self.rows[key] = (tuple(band), content)
+        return True
+
+    def blit(self, surface, pos):
+        return surface.blit(self.surface, pos)
+
+# One retained panel per generic menu title, see _render_menu_generic
+_GENERIC_PANELS = OrderedDict()
+_GENERIC_PANELS_MAX = 16
+
 def _render_menu_generic(context, title, lines, selected_idx=-1):
-    screen = context.screen
     font = context.font
     tile_size = context.tile_size
 
@@ -42,34 +95,32 @@ def _render_menu_generic(context, title, lines, selected_idx=-1):
     # Center the box
     bx = (context.width - max_w) // 2
     by = (context.height - total_h) // 2
-    
-    # Draw semi-transparent panel
-    overlay = pygame.Surface((max_w, total_h), pygame.SRCALPHA)
-    overlay.fill((30, 30, 30, 230)) # Dark gray with alpha
-    screen.blit(overlay, (bx, by))
-    pygame.draw.rect(screen, (200, 200, 200), (bx, by, max_w, total_h), 2) # Border
 
-    # Title
-    title_surf = font.render(title, True, (0, 255, 255))
-    screen.blit(title_surf, (bx + 20, by + 15))
+    panel = _GENERIC_PANELS.get(title)
+    if panel is None:
+        panel = _GENERIC_PANELS[title] = Panel((30, 30, 30, 230), (200, 200, 200))
+        if len(_GENERIC_PANELS) > _GENERIC_PANELS_MAX:
+            _GENERIC_PANELS.popitem(last=False)
+    _GENERIC_PANELS.move_to_end(title)
 
-    y = by + tile_size + 30
-    for i, line in enumerate(lines):
-        color = (255, 255, 255)
-        bg_color = None
+    if panel.begin((font, tile_size), (max_w, total_h)):
+        panel.surface.blit(font.render(title, True, (0, 255, 255)), (20, 15))
 
-        if i == selected_idx:
-            color = (0, 0, 0)
-            bg_color = (200, 200, 200)
-            pygame.draw.rect(screen, bg_color, (bx + 5, y - 2, max_w - 10, tile_size + 4))
+    def paint(line, selected):
+        def _paint(surf, band):
+            color = (255, 255, 255)
+            if selected:
+                color = (0, 0, 0)
+                pygame.draw.rect(surf, (200, 200, 200), (5, band.y, max_w - 10, tile_size + 4))
+            surf.blit(font.render(line, True, color), (20, band.y + 2))
+        return _paint
 
-        surf = font.render(line, True, color)
-        screen.blit(surf, (bx + 20, y))
+    y = tile_size + 30
+    for i, line in enumerate(lines):
+        selected = i == selected_idx
+        panel.row(i, (0, y - 2, max_w, tile_size + 6), (line, selected), paint(line, selected))
         y += tile_size + 6
-
-    def draw(self, surface):
-        lines = [opt[0] for opt in self.options]
-        _render_menu_generic(self.context, self.title, lines, self.selected_idx)
+    panel.blit(context.screen, (bx, by))
 
 class MenuState(State):
     def __init__(self, manager, context, title, options):
@@ -105,6 +156,7 @@ class TextInputState(State):
         self.prompt = prompt
         self.callback = callback
         self.input_text = str(initial_text)
+        self.panel = Panel((30, 30, 30, 240), (0, 255, 255))
         
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -126,16 +178,14 @@ class TextInputState(State):
         bx = (self.context.width - box_w) // 2
         by = (self.context.height - box_h) // 2
 
-        s = pygame.Surface((box_w, box_h), pygame.SRCALPHA)
-        s.fill((30, 30, 30, 240))
-        surface.blit(s, (bx, by))
-        pygame.draw.rect(surface, (0, 255, 255), (bx, by, box_w, box_h), 2)
+        font = self.context.font
+        if self.panel.begin(font, (box_w, box_h)):
+            self.panel.surface.blit(font.render(self.prompt, True, (0, 255, 255)), (20, 15))
 
-        prompt_surf = self.context.font.render(self.prompt, True, (0, 255, 255))
-        surface.blit(prompt_surf, (bx + 20, by + 15))
-        
-        input_surf = self.context.font.render(self.input_text + "_", True, (255, 255, 255))
-        surface.blit(input_surf, (bx + 20, by + 50))
+        text = self.input_text + "_"
+        self.panel.row("input", (0, 45, box_w, box_h - 45), text,
+                       lambda surf, band: surf.blit(font.render(text, True, (255, 255, 255)), (20, 50)))
+        self.panel.blit(surface, (bx, by))
 
 class ConfirmationState(State):
     def __init__(self, manager, context, prompt, callback):
@@ -156,6 +206,7 @@ class ConfirmationState(State):
         self.yes_rect = pygame.Rect(self.bx + self.box_w//2 - 110, self.by + 50, 80, 30)
         self.no_rect = pygame.Rect(self.bx + self.box_w//2 + 30, self.by + 50, 80, 30)
         self.hover_btn = None
+        self.panel = Panel((30, 30, 30, 240), (255, 200, 0))
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -184,26 +235,23 @@ class ConfirmationState(State):
                     self.callback(False)
 
     def draw(self, surface):
-        s = pygame.Surface((self.box_w, self.box_h), pygame.SRCALPHA)
-        s.fill((30, 30, 30, 240))
-        surface.blit(s, (self.bx, self.by))
-        pygame.draw.rect(surface, (255, 200, 0), (self.bx, self.by, self.box_w, self.box_h), 2)
-
-        text_surf = self.context.font.render(self.prompt, True, (255, 255, 255))
-        surface.blit(text_surf, (self.bx + (self.box_w - text_surf.get_width()) // 2, self.by + 15))
+        font = self.context.font
+        if self.panel.begin(font, (self.box_w, self.box_h)):
+            text_surf = font.render(self.prompt, True, (255, 255, 255))
+            self.panel.surface.blit(text_surf, ((self.box_w - text_surf.get_width()) // 2, 15))
 
-        # Draw Buttons
+        # Buttons are the only rows, repainted when the hover changes
         yes_color = (100, 255, 100) if self.hover_btn == 'yes' else (60, 180, 60)
         no_color = (255, 100, 100) if self.hover_btn == 'no' else (180, 60, 60)
-        
-        pygame.draw.rect(surface, yes_color, self.yes_rect)
-        pygame.draw.rect(surface, no_color, self.no_rect)
-        
-        yes_txt = self.context.font.render("YES", True, (0,0,0))
-        no_txt = self.context.font.render("NO", True, (0,0,0))
-        
-        surface.blit(yes_txt, (self.yes_rect.centerx - yes_txt.get_width()//2, self.yes_rect.centery - yes_txt.get_height()//2))
-        surface.blit(no_txt, (self.no_rect.centerx - no_txt.get_width()//2, self.no_rect.centery - no_txt.get_height()//2))
+        buttons = (("yes", "YES", self.yes_rect, yes_color), ("no", "NO", self.no_rect, no_color))
+        for key, label, rect, color in buttons:
+            rect = rect.move(-self.bx, -self.by)
+            def paint(surf, band, label=label, color=color):
+                pygame.draw.rect(surf, color, band)
+                txt = font.render(label, True, (0, 0, 0))
+                surf.blit(txt, (band.centerx - txt.get_width() // 2, band.centery - txt.get_height() // 2))
+            self.panel.row(key, rect, color, paint)
+        self.panel.blit(surface, (self.bx, self.by))
 
 class MessageState(State):
     def __init__(self, manager, context, text, callback=None):
@@ -211,6 +259,7 @@ class MessageState(State):
         self.context = context
         self.text = text
         self.callback = callback
+        self.panel = Panel((0, 0, 0, 255), (255, 255, 255))
 
     def handle_event(self, event):
         if event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:
@@ -219,13 +268,13 @@ class MessageState(State):
                 self.callback()
 
     def draw(self, surface):
-        text_surf = self.context.font.render(self.text, True, (255, 255, 255))
-        rect = text_surf.get_rect(center=(self.context.width // 2, self.context.height // 2))
-        bg_rect = rect.inflate(40, 40)
-
-        pygame.draw.rect(surface, (0, 0, 0), bg_rect)
-        pygame.draw.rect(surface, (255, 255, 255), bg_rect, 2)
-        surface.blit(text_surf, rect)
+        font = self.context.font
+        if self.panel.key is None or self.panel.key[0] != (font, self.text):
+            text_surf = font.render(self.text, True, (255, 255, 255))
+            self.panel.begin((font, self.text), (text_surf.get_width() + 40, text_surf.get_height() + 40))
+            self.panel.surface.blit(text_surf, (20, 20))
+        bg_rect = self.panel.surface.get_rect(center=(self.context.width // 2, self.context.height // 2))
+        self.panel.blit(surface, bg_rect)
 
 class HelpState(State):
     def __init__(self, manager, context, bindings):
@@ -234,6 +283,7 @@ class HelpState(State):
         self.bindings = bindings
         self.scroll = 0
         self.all_lines = self._generate_help()
+        self.panel = Panel((20, 20, 30, 230), (0, 255, 255))
 
     def _generate_help(self):
         try:
@@ -304,26 +354,23 @@ class HelpState(State):
     def draw(self, surface):
         overlay_w, overlay_h = self.context.width - 100, self.context.height - 100
         ox, oy = 50, 50
-        
-        # Proper transparency
-        temp_surface = pygame.Surface((overlay_w, overlay_h), pygame.SRCALPHA)
-        temp_surface.fill((20, 20, 30, 230))
-        surface.blit(temp_surface, (ox, oy))
-        
-        pygame.draw.rect(surface, (0, 255, 255), (ox, oy, overlay_w, overlay_h), 2)
+        font = self.context.font
+        self.panel.begin(font, (overlay_w, overlay_h))
 
         line_h = 24
         max_lines = (overlay_h - 40) // line_h
         for i in range(max_lines):
             idx = self.scroll + i
-            if idx < len(self.all_lines):
-                line_text = self.all_lines[idx]
-                color = (255, 255, 255)
-                if line_text.startswith("---"): color = (255, 255, 0)
-                if line_text.startswith("==="): color = (0, 255, 255)
-                
-                surf = self.context.font.render(line_text, True, color)
-                surface.blit(surf, (ox + 20, oy + 20 + i * line_h))
+            line_text = self.all_lines[idx] if idx < len(self.all_lines) else ""
+            color = (255, 255, 255)
+            if line_text.startswith("---"): color = (255, 255, 0)
+            if line_text.startswith("==="): color = (0, 255, 255)
+
+            def paint(surf, band, line_text=line_text, color=color):
+                if line_text:
+                    surf.blit(font.render(line_text, True, color), (20, band.y))
+            self.panel.row(i, (0, 20 + i * line_h, overlay_w, line_h), line_text, paint)
+        self.panel.blit(surface, (ox, oy))
 
 class FormState(State):
     def __init__(self, manager, context, title, fields, callback):
@@ -336,6 +383,7 @@ class FormState(State):
         self.options = fields + [["", "", "spacer"], ["Apply", "", "apply"], ["Cancel", "", "cancel"]]
         self.is_editing = False
         self.editing_text = ""
+        self.panel = Panel((50, 50, 70, 250), (0, 255, 255), 3)
 
     def handle_event(self, event):
         if self.is_editing:
@@ -412,35 +460,42 @@ class FormState(State):
         bx = (self.context.width - max_w) // 2
         by = (self.context.height - total_h) // 2
 
-        s = pygame.Surface((max_w, total_h), pygame.SRCALPHA)
-        s.fill((50, 50, 70, 250))
-        surface.blit(s, (bx, by))
-        pygame.draw.rect(surface, (0, 255, 255), (bx, by, max_w, total_h), 3)
+        _draw_form_panel(self.panel, self.context, self.title, self.options, self.selected,
+                        self.is_editing, self.editing_text, max_w, total_h)
+        self.panel.blit(surface, (bx, by))
 
-        title_surf = self.context.font.render(self.title, True, (255, 255, 0))
-        surface.blit(title_surf, (bx + 20, by + 15))
+def _draw_form_panel(panel, context, title, options, selected, is_editing, editing_text, max_w, total_h):
+    """Paint a FormState style field list onto a retained panel."""
+    font = context.font
+    tile_size = context.tile_size
+    if panel.begin((font, tile_size, title), (max_w, total_h)):
+        panel.surface.blit(font.render(title, True, (255, 255, 0)), (20, 15))
 
-        y = by + 60
-        for i, (label, val, key) in enumerate(self.options):
+    y = 60
+    for i, (label, val, key) in enumerate(options):
+        is_selected = i == selected
+        display_val = val
+        if is_selected and is_editing:
+            display_val = editing_text + "_"
+
+        def paint(surf, band, key=key, label=label, display_val=display_val, is_selected=is_selected):
             color = (255, 255, 255)
-            if i == self.selected:
-                bg_color = (100, 100, 150) if self.is_editing else (255, 255, 255)
-                pygame.draw.rect(surface, bg_color, (bx + 10, y - 5, max_w - 20, self.context.tile_size + 10))
-                color = (255, 255, 255) if self.is_editing else (0, 0, 0)
-            
-            if key == "apply": 
-                surf = self.context.font.render("[ SAVE CHANGES ]", True, color)
-                surface.blit(surf, (bx + (max_w - surf.get_width())//2, y))
+            if is_selected:
+                bg_color = (100, 100, 150) if is_editing else (255, 255, 255)
+                pygame.draw.rect(surf, bg_color, (10, band.y, max_w - 20, band.h))
+                color = (255, 255, 255) if is_editing else (0, 0, 0)
+
+            if key == "apply":
+                text_surf = font.render("[ SAVE CHANGES ]", True, color)
+                surf.blit(text_surf, ((max_w - text_surf.get_width()) // 2, band.y + 5))
             elif key == "cancel":
-                surf = self.context.font.render("[ CANCEL ]", True, color)
-                surface.blit(surf, (bx + (max_w - surf.get_width())//2, y))
+                text_surf = font.render("[ CANCEL ]", True, color)
+                surf.blit(text_surf, ((max_w - text_surf.get_width()) // 2, band.y + 5))
             elif key != "spacer":
-                display_val = val
-                if i == self.selected and self.is_editing:
-                    display_val = self.editing_text + "_"
-                surf = self.context.font.render(f"{label}: {display_val}", True, color)
-                surface.blit(surf, (bx + 20, y))
-            y += self.context.tile_size + 10
+                surf.blit(font.render(f"{label}: {display_val}", True, color), (20, band.y + 5))
+        content = (label, display_val, key, is_selected, is_selected and is_editing)
+        panel.row(i, (0, y - 5, max_w, tile_size + 10), content, paint)
+        y += tile_size + 10
 
 class ContextMenuState(State):
     def __init__(self, manager, context, options, screen_pos):
@@ -486,6 +541,9 @@ class ContextMenuState(State):
         if x + self.width > context.width: x = max(0, context.width - self.width)
         if y + self.height > context.height: y = max(0, context.height - self.height)
         self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.panel = Panel((40, 40, 40, 255), (150, 150, 150), 1)
+        self.shadow = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.shadow.fill((0, 0, 0, 100))
 
     def get_index_at(self, pos):
         mx, my = pos
@@ -528,24 +586,17 @@ class ContextMenuState(State):
             if event.key == pygame.K_ESCAPE: self.manager.pop()
 
     def draw(self, surface):
-        shadow = self.rect.copy()
-        shadow.move_ip(4, 4)
-        s = pygame.Surface((shadow.width, shadow.height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 100))
-        surface.blit(s, shadow)
-
-        pygame.draw.rect(surface, (40, 40, 40), self.rect)
-        pygame.draw.rect(surface, (150, 150, 150), self.rect, 1)
-        
-        # Draw Separator if 2 cols
-        current_x = self.rect.x
-        for i in range(self.cols - 1):
-             current_x += self.col_widths[i]
-             pygame.draw.line(surface, (100, 100, 100), (current_x, self.rect.y + 5), (current_x, self.rect.y + self.height - 5))
+        surface.blit(self.shadow, self.rect.move(4, 4))
 
         font = self.context.font
-        current_x = self.rect.x
-        
+        if self.panel.begin(font, self.rect.size):
+            # Draw Separator if 2 cols
+            current_x = 0
+            for i in range(self.cols - 1):
+                current_x += self.col_widths[i]
+                pygame.draw.line(self.panel.surface, (100, 100, 100), (current_x, 5), (current_x, self.height - 5))
+
+        current_x = 0
         for c in range(self.cols):
             start = c * self.rows
             end = min(start + self.rows, len(self.options))
@@ -553,16 +604,18 @@ class ContextMenuState(State):
             for r in range(end - start):
                 idx = start + r
                 label, _ = self.options[idx]
-                
-                # Item Rect
-                item_rect = pygame.Rect(current_x, self.rect.y + 5 + r * self.item_height, self.col_widths[c], self.item_height)
-                
-                color = (200, 200, 200)
-                if idx == self.selected_idx:
-                    pygame.draw.rect(surface, (60, 60, 80), item_rect)
-                    color = (255, 255, 255)
-                
-                surf = font.render(label, True, color)
-                surface.blit(surf, (item_rect.x + 20, item_rect.y + (self.item_height - surf.get_height()) // 2))
+                selected = idx == self.selected_idx
+
+                def paint(surf, item_rect, label=label, selected=selected, text_x=current_x + 20):
+                    color = (200, 200, 200)
+                    if selected:
+                        pygame.draw.rect(surf, (60, 60, 80), item_rect)
+                        color = (255, 255, 255)
+                    text_surf = font.render(label, True, color)
+                    surf.blit(text_surf, (text_x, item_rect.y + (self.item_height - text_surf.get_height()) // 2))
+                # Item Rect, kept clear of the column separator
+                item_rect = (current_x + (1 if c else 0), 5 + r * self.item_height, self.col_widths[c] - (1 if c else 0), self.item_height)
+                self.panel.row(idx, item_rect, (label, selected), paint)
             
             current_x += self.col_widths[c]
+        self.panel.blit(surface, self.rect)
@@ -3,7 +3,7 @@ from generation import (
     cellular_automata_cave, perlin_noise_generation, voronoi_generation,
     apply_cellular_automata_region, apply_weighted_noise_region, apply_shuffle_region
 )
-from menu.base import FormState, MessageState, State, MenuState
+from menu.base import FormState, MessageState, State, MenuState, Panel
 from menu.pickers import TilePickerState, MultiTilePickerState
 import pygame
 from core import EditorSession
@@ -116,6 +116,7 @@ class BaseGenConfigState(State):
         self.title = title
         self.options = [] # list of (label, getter, action/setter)
         self.selected_idx = 0
+        self.panel = Panel((0, 0, 0, 200))
         
     def _get_tile_label(self, tid):
         t = REGISTRY.get(tid)
@@ -148,24 +149,25 @@ class BaseGenConfigState(State):
              pass
 
     def draw(self, surface):
-        overlay = pygame.Surface((self.context.width, self.context.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        surface.blit(overlay, (0, 0))
-
+        font = self.context.font
         menu_w, menu_h = 600, 500
         mx, my = (self.context.width - menu_w)//2, (self.context.height - menu_h)//2
-        pygame.draw.rect(surface, (30, 30, 40), (mx, my, menu_w, menu_h))
-        pygame.draw.rect(surface, (0, 255, 255), (mx, my, menu_w, menu_h), 2)
-
-        title = self.context.font.render(self.title, True, (0, 255, 255))
-        surface.blit(title, (mx + 20, my + 20))
+        if self.panel.begin((font, self.title), (self.context.width, self.context.height)):
+            box = (mx, my, menu_w, menu_h)
+            pygame.draw.rect(self.panel.surface, (30, 30, 40), box)
+            pygame.draw.rect(self.panel.surface, (0, 255, 255), box, 2)
+            self.panel.surface.blit(font.render(self.title, True, (0, 255, 255)), (mx + 20, my + 20))
 
         for i, (label, getter, _) in enumerate(self.options):
             color = (255, 255, 255) if i == self.selected_idx else (150, 150, 150)
             val_str = getter() if getter else ""
             text = f"{label}: {val_str}"
-            surf = self.context.font.render(text, True, color)
-            surface.blit(surf, (mx + 30, my + 80 + i * 40))
+
+            def paint(surf, band, text=text, color=color):
+                pygame.draw.rect(surf, (30, 30, 40), band)
+                surf.blit(font.render(text, True, color), (mx + 30, band.y))
+            self.panel.row(i, (mx + 2, my + 80 + i * 40, menu_w - 4, 40), (text, color), paint)
+        self.panel.blit(surface, (0, 0))
 
 class CAGenState(BaseGenConfigState):
     def __init__(self, manager, context, session):
@@ -1,7 +1,7 @@
 import os
 from state_engine import State
 from tiles import REGISTRY
-from map_io import export_to_image
+from map_io import export_to_image, load_map
 from menu.base import TextInputState, FormState
 
 class NewMapState(FormState):
@@ -51,17 +51,9 @@ class LoadMapState(State):
     def enter(self, **kwargs):
         def on_filename(filename):
             if filename and os.path.exists(filename):
-                from core import Map
                 try:
-                    with open(filename, "r") as f:
-                        lines = [line.rstrip("\n") for line in f]
-                    if lines:
-                        w = max(len(l) for l in lines); h = len(lines)
-                        w = max(w, self.view_width); h = max(h, self.view_height)
-                        m = Map(w, h)
-                        for y, line in enumerate(lines):
-                            for x, ch in enumerate(line):
-                                m.set(x, y, REGISTRY.get_by_char(ch))
+                    m = load_map(filename, self.view_width, self.view_height)
+                    if m:
                         self.callback(m)
                         return
                 except: pass
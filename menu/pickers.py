@@ -3,7 +3,8 @@ from statemachine import StateMachine, State as SMState
 from state_engine import State
 from utils import get_all_colors
 from tiles import REGISTRY
-from menu.base import _render_menu_generic, TextInputState
+from menu.base import _render_menu_generic, TextInputState, Panel
+from tile_grid import TileGrid
 
 class ColorPickerMachine(StateMachine):
     selecting = SMState(initial=True)
@@ -53,100 +54,137 @@ class ColorPickerState(State):
                  for i, opt in enumerate(self.options)]
         _render_menu_generic(self.context, "SELECT COLOR", lines, self.selected)
 
-class TilePickerState(State):
-    def __init__(self, manager, context, callback):
+class _TileGridPickerState(State):
+    """Searchable, scrolling grid of registry tiles. Typing filters by name or char."""
+    title = "SELECT TILE"
+    overlay_alpha = 200
+    # Multi-selection pickers toggle with space; elsewhere space is part of the search
+    space_toggles = False
+    origin = (20, 60)
+
+    def __init__(self, manager, context):
         super().__init__(manager)
         self.context = context
-        self.callback = callback
-        self.all_tiles = REGISTRY.get_all()
-        self.selected_idx = 0
-        self.cols = (context.width - 40) // (context.tile_size + 10) or 1
+        self.grid = TileGrid((context.width - 40) // 30, 30)
+        self.grid.refresh()
+        self.cursor_idx = 0
+        self.panel = Panel((0, 0, 0, self.overlay_alpha))
+
+    @property
+    def visible_rows(self):
+        return max(1, (self.context.height - self.origin[1] - 40) // self.grid.spacing)
+
+    def _move(self, delta):
+        ids = self.grid.tile_ids
+        if not ids: return
+        self.cursor_idx = (self.cursor_idx + delta) % len(ids)
+        self.grid.ensure_visible(self.cursor_idx, self.visible_rows)
+
+    def _choose(self, index):
+        """Enter on the tile at index into grid.tile_ids."""
+
+    def _click(self, index):
+        pass
 
     def handle_event(self, event):
+        ids = self.grid.tile_ids
+        if event.type == pygame.MOUSEWHEEL:
+            self.grid.scroll_by(-event.y, self.visible_rows)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            index = self.grid.index_at(event.pos[0] - self.origin[0] + 2, event.pos[1] - self.origin[1] + 2, self.visible_rows)
+            if index >= 0:
+                self.cursor_idx = index
+                self._click(index)
         if event.type != pygame.KEYDOWN: return
-        if event.key == pygame.K_UP: self.selected_idx = (self.selected_idx - self.cols) % len(self.all_tiles)
-        elif event.key == pygame.K_DOWN: self.selected_idx = (self.selected_idx + self.cols) % len(self.all_tiles)
-        elif event.key == pygame.K_LEFT: self.selected_idx = (self.selected_idx - 1) % len(self.all_tiles)
-        elif event.key == pygame.K_RIGHT: self.selected_idx = (self.selected_idx + 1) % len(self.all_tiles)
+        cols = self.grid.cols
+        if event.key == pygame.K_UP: self._move(-cols)
+        elif event.key == pygame.K_DOWN: self._move(cols)
+        elif event.key == pygame.K_LEFT: self._move(-1)
+        elif event.key == pygame.K_RIGHT: self._move(1)
+        elif event.key == pygame.K_PAGEUP: self._move(-cols * self.visible_rows)
+        elif event.key == pygame.K_PAGEDOWN: self._move(cols * self.visible_rows)
         elif event.key == pygame.K_RETURN:
-            self.callback(self.all_tiles[self.selected_idx].id)
-            self.manager.pop()
+            if ids: self._choose(self.cursor_idx)
         elif event.key == pygame.K_ESCAPE:
-            self.manager.pop()
+            if self.grid.query:
+                self._search("")
+            else:
+                self.manager.pop()
+        elif event.key == pygame.K_BACKSPACE:
+            self._search(self.grid.query[:-1])
+        elif event.key == pygame.K_SPACE and self.space_toggles:
+            self._toggle(self.cursor_idx)
+        elif event.unicode and event.unicode.isprintable():
+            self._search(self.grid.query + event.unicode)
+
+    def _search(self, query):
+        self.grid.set_query(query)
+        self.cursor_idx = 0
+
+    def _style(self, index, tid):
+        return (None, (255, 255, 0) if index == self.cursor_idx else None)
 
     def draw(self, surface):
-        s = pygame.Surface((self.context.width, self.context.height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 200))
-        surface.blit(s, (0, 0))
-        
-        surface.blit(self.context.font.render("SELECT TILE", True, (255, 255, 255)), (20, 20))
-        
-        for i, tile in enumerate(self.all_tiles):
-            row = i // self.cols
-            col = i % self.cols
-            px = 20 + col * (self.context.tile_size + 10)
-            py = 60 + row * (self.context.tile_size + 10)
-            
-            if i == self.selected_idx:
-                pygame.draw.rect(surface, (255, 255, 0), (px-2, py-2, self.context.tile_size+4, self.context.tile_size+4), 2)
-            
-            glyph = self.context.get_glyph(tile.id)
-            surface.blit(glyph, (px, py))
-
-class MultiTilePickerState(State):
+        font = self.context.font
+        width, height = self.context.width, self.context.height
+        panel = self.panel
+        panel.begin(font, (width, height))
+        ids = self.grid.refresh()
+        self.cursor_idx = min(self.cursor_idx, max(0, len(ids) - 1))
+
+        header = f"{self.title}    Search: {self.grid.query}_"
+        panel.row("header", (0, 10, width, 40), header,
+                  lambda surf, band: surf.blit(font.render(header, True, (255, 255, 255)), (20, 20)))
+
+        self.grid.draw(panel, self.context.get_ui_atlas(), self.origin, self.visible_rows, self._style)
+
+        if ids:
+            t = REGISTRY.get(ids[self.cursor_idx])
+            footer = f"[{t.char}] {t.name}    {self.cursor_idx + 1}/{len(ids)}" if t else ""
+        else:
+            footer = "No tiles match"
+        panel.row("footer", (0, height - 35, width, 30), footer,
+                  lambda surf, band: surf.blit(font.render(footer, True, (150, 150, 150)), (20, band.y + 5)))
+        panel.blit(surface, (0, 0))
+
+class TilePickerState(_TileGridPickerState):
+    def __init__(self, manager, context, callback):
+        super().__init__(manager, context)
+        self.callback = callback
+
+    def _choose(self, index):
+        self.callback(self.grid.tile_ids[index])
+        self.manager.pop()
+
+    def _click(self, index):
+        self._choose(index)
+
+class MultiTilePickerState(_TileGridPickerState):
+    title = "SELECT TILES (SPACE to toggle, ENTER to confirm)"
+    overlay_alpha = 220
+    space_toggles = True
+
     def __init__(self, manager, context, callback, initial_selection=None):
-        super().__init__(manager)
-        self.context = context
+        super().__init__(manager, context)
         self.callback = callback
-        self.all_tiles = REGISTRY.get_all()
-        self.selected_indices = set()
-        if initial_selection:
-            for idx, tile in enumerate(self.all_tiles):
-                if tile.id in initial_selection:
-                    self.selected_indices.add(idx)
-                    
-        self.cursor_idx = 0
-        self.cols = (context.width - 40) // (context.tile_size + 10) or 1
+        self.selected_ids = set(initial_selection or ())
 
-    def handle_event(self, event):
-        if event.type != pygame.KEYDOWN: return
-        
-        if event.key == pygame.K_UP: self.cursor_idx = (self.cursor_idx - self.cols) % len(self.all_tiles)
-        elif event.key == pygame.K_DOWN: self.cursor_idx = (self.cursor_idx + self.cols) % len(self.all_tiles)
-        elif event.key == pygame.K_LEFT: self.cursor_idx = (self.cursor_idx - 1) % len(self.all_tiles)
-        elif event.key == pygame.K_RIGHT: self.cursor_idx = (self.cursor_idx + 1) % len(self.all_tiles)
-        elif event.key == pygame.K_SPACE:
-            if self.cursor_idx in self.selected_indices:
-                self.selected_indices.remove(self.cursor_idx)
-            else:
-                self.selected_indices.add(self.cursor_idx)
-        elif event.key == pygame.K_RETURN:
-            selected_ids = [self.all_tiles[i].id for i in self.selected_indices]
-            self.callback(selected_ids)
-            self.manager.pop()
-        elif event.key == pygame.K_ESCAPE:
-            self.manager.pop()
+    def _choose(self, index):
+        self.callback(list(self.selected_ids))
+        self.manager.pop()
 
-    def draw(self, surface):
-        s = pygame.Surface((self.context.width, self.context.height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 220))
-        surface.blit(s, (0, 0))
-        
-        surface.blit(self.context.font.render("SELECT TILES (SPACE to toggle, ENTER to confirm)", True, (255, 255, 255)), (20, 20))
-        
-        for i, tile in enumerate(self.all_tiles):
-            row = i // self.cols
-            col = i % self.cols
-            px = 20 + col * (self.context.tile_size + 10)
-            py = 60 + row * (self.context.tile_size + 10)
-            
-            # Draw selection highlight
-            if i in self.selected_indices:
-                pygame.draw.rect(surface, (0, 255, 0), (px-2, py-2, self.context.tile_size+4, self.context.tile_size+4), 0)
-                
-            # Draw cursor
-            if i == self.cursor_idx:
-                pygame.draw.rect(surface, (255, 255, 0), (px-2, py-2, self.context.tile_size+4, self.context.tile_size+4), 2)
-            
-            glyph = self.context.get_glyph(tile.id)
-            surface.blit(glyph, (px, py))
+    def _click(self, index):
+        self._toggle(index)
+
+    def _toggle(self, index):
+        if not self.grid.tile_ids: return
+        tid = self.grid.tile_ids[index]
+        if tid in self.selected_ids:
+            self.selected_ids.remove(tid)
+        else:
+            self.selected_ids.add(tid)
+
+    def _style(self, index, tid):
+        # Selection highlight and cursor
+        return ((0, 255, 0) if tid in self.selected_ids else None,
+                (255, 255, 0) if index == self.cursor_idx else None)
@@ -1,10 +1,10 @@
 import pygame
 from statemachine import StateMachine, State as SMState
 from state_engine import State
-from tiles import REGISTRY
+from tiles import REGISTRY, TileSprite
 from utils import parse_color_name, get_color_name
 from menu.pickers import ColorPickerState
-from menu.base import TextInputState, ConfirmationState
+from menu.base import TextInputState, ConfirmationState, Panel, _draw_form_panel
 
 class TileRegistryMachine(StateMachine):
     browsing = SMState(initial=True)
@@ -17,6 +17,8 @@ class TileRegistryMachine(StateMachine):
     cancel_action = (adding.to(browsing) | editing.to(browsing))
 
 class TileRegistryState(State):
+    opaque = True
+
     def __init__(self, manager, context):
         super().__init__(manager)
         self.context = context
@@ -28,6 +30,8 @@ class TileRegistryState(State):
         self.all_tiles = []
         self.is_editing = False
         self.editing_text = ""
+        self.panel = Panel((20, 20, 20, 255))
+        self.form_panel = Panel((50, 50, 70, 250), (0, 255, 255), 3)
 
     def enter(self, **kwargs):
         self.refresh_data()
@@ -66,13 +70,15 @@ class TileRegistryState(State):
         elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
             self.manager.pop()
         elif event.key == pygame.K_a:
-            self.fields = [["Char", "", "char"], ["Name", "New Tile", "name"], ["Color", "white", "color"]]
+            self.fields = [["Char", "", "char"], ["Name", "New Tile", "name"], ["Color", "white", "color"],
+                           ["Sprite", "", "sprite"]]
             self.form_selected = 0
             self.is_editing = False
             self.machine.start_add()
         elif event.key == pygame.K_e and self.all_tiles:
             t = self.all_tiles[self.selected_idx]
-            self.fields = [["Name", t.name, "name"], ["Color", get_color_name(t.color), "color"]]
+            self.fields = [["Name", t.name, "name"], ["Color", get_color_name(t.color), "color"],
+                           ["Sprite", t.sprite.spec() if t.sprite else "", "sprite"]]
             self.form_selected = 0
             self.is_editing = False
             self.machine.start_edit()
@@ -82,7 +88,6 @@ class TileRegistryState(State):
                 if confirmed:
                     REGISTRY.delete(target.id)
                     self.refresh_data()
-                    self.context.invalidate_cache()
             self.manager.push(ConfirmationState(self.manager, self.context, f"Delete tile '{target.char}'?", on_confirm))
 
     def _handle_form(self, event):
@@ -138,50 +143,57 @@ class TileRegistryState(State):
 
     def _apply_form(self):
         res = {f[2]: f[1] for f in self.fields}
+        sprite = None
+        if res["sprite"].strip():
+            sprite = TileSprite.parse_spec(res["sprite"])
+            if sprite is None:
+                self.manager.notify("Sprite must be 'image x,y,w,h'", color=(255, 100, 100))
+                return
         if self.machine.current_state == TileRegistryMachine.adding:
             if res.get("char") and len(res["char"]) == 1:
-                REGISTRY.register(res["char"], res["name"], color=parse_color_name(res["color"]))
+                REGISTRY.register(res["char"], res["name"], color=parse_color_name(res["color"]), sprite=sprite)
         else: # Editing
             target = self.all_tiles[self.selected_idx]
-            REGISTRY.update_tile(target.id, name=res["name"], color=parse_color_name(res["color"]))
+            REGISTRY.update_tile(target.id, name=res["name"], color=parse_color_name(res["color"]), sprite=sprite)
         
+        # The renderer is subscribed to REGISTRY and evicts only the affected tile
         self.refresh_data()
-        self.context.invalidate_cache()
         self.machine.finish_action()
 
     def draw(self, surface):
-        self.context.screen.fill((20, 20, 20))
         font = self.context.font
         tile_size = self.context.tile_size
-        
-        title = font.render("=== TILE REGISTRY ===", True, (0, 255, 255))
-        self.context.screen.blit(title, (20, 20))
+        width, height = self.context.width, self.context.height
+        if self.panel.begin((font, tile_size), (width, height)):
+            self.panel.surface.blit(font.render("=== TILE REGISTRY ===", True, (0, 255, 255)), (20, 20))
+            help_text = font.render("[A] Add New | [E] Edit | [Del] Delete | [Q] Back", True, (0, 255, 0))
+            self.panel.surface.blit(help_text, (20, height - 40))
         
         row_height = tile_size + 15
-        available_height = self.context.height - 120
+        available_height = height - 120
         rows_per_page = available_height // row_height
         
         y = 70
-        visible_tiles = self.all_tiles[self.scroll_offset : self.scroll_offset + rows_per_page]
-        for idx_rel, t in enumerate(visible_tiles):
-            i = self.scroll_offset + idx_rel
-            color = (255, 255, 255)
-            if i == self.selected_idx:
-                pygame.draw.rect(self.context.screen, (60, 60, 60), (0, y - 2, self.context.width, tile_size + 10))
-                color = (255, 255, 0)
-
-            char_surf = font.render(f"[{t.char}]", True, color)
-            name_surf = font.render(f"{t.name[:25]}", True, color)
-            col_val = get_color_name(t.color)
-            color_surf = font.render(f"Color: {col_val}", True, (150, 150, 150) if i != self.selected_idx else (200, 200, 200))
-            
-            self.context.screen.blit(char_surf, (30, y))
-            self.context.screen.blit(name_surf, (100, y))
-            self.context.screen.blit(color_surf, (400, y))
+        for row in range(rows_per_page):
+            i = self.scroll_offset + row
+            t = self.all_tiles[i] if i < len(self.all_tiles) else None
+            selected = i == self.selected_idx
+            content = (t.char, t.name[:25], get_color_name(t.color), selected) if t else None
+
+            def paint(surf, band, content=content):
+                if content is None: return
+                char, name, col_val, selected = content
+                color = (255, 255, 255)
+                if selected:
+                    pygame.draw.rect(surf, (60, 60, 60), (0, band.y, width, tile_size + 10))
+                    color = (255, 255, 0)
+                ty = band.y + 2
+                surf.blit(font.render(f"[{char}]", True, color), (30, ty))
+                surf.blit(font.render(name, True, color), (100, ty))
+                surf.blit(font.render(f"Color: {col_val}", True, (200, 200, 200) if selected else (150, 150, 150)), (400, ty))
+            self.panel.row(row, (0, y - 2, width, row_height), content, paint)
             y += row_height
-            
-        help_text = font.render("[A] Add New | [E] Edit | [Del] Delete | [Q] Back", True, (0, 255, 0))
-        self.context.screen.blit(help_text, (20, self.context.height - 40))
+        self.panel.blit(self.context.screen, (0, 0))
 
         if self.machine.current_state in [TileRegistryMachine.adding, TileRegistryMachine.editing]:
             self._draw_form_overlay()
@@ -195,33 +207,7 @@ class TileRegistryState(State):
         bx = (self.context.width - max_w) // 2
         by = (self.context.height - total_h) // 2
 
-        s = pygame.Surface((max_w, total_h), pygame.SRCALPHA)
-        s.fill((50, 50, 70, 250))
-        self.context.screen.blit(s, (bx, by))
-        pygame.draw.rect(self.context.screen, (0, 255, 255), (bx, by, max_w, total_h), 3)
-
-        title_surf = self.context.font.render(title, True, (255, 255, 0))
-        self.context.screen.blit(title_surf, (bx + 20, by + 15))
-
-        y = by + 60
-        for i, (label, val, key) in enumerate(options):
-            color = (255, 255, 255)
-            if i == self.form_selected:
-                bg_color = (100, 100, 150) if self.is_editing else (255, 255, 255)
-                pygame.draw.rect(self.context.screen, bg_color, (bx + 10, y - 5, max_w - 20, self.context.tile_size + 10))
-                color = (255, 255, 255) if self.is_editing else (0, 0, 0)
-            
-            if key == "apply": 
-                surf = self.context.font.render("[ SAVE CHANGES ]", True, color)
-                self.context.screen.blit(surf, (bx + (max_w - surf.get_width())//2, y))
-            elif key == "cancel":
-                surf = self.context.font.render("[ CANCEL ]", True, color)
-                self.context.screen.blit(surf, (bx + (max_w - surf.get_width())//2, y))
-            elif key != "spacer":
-                display_val = val
-                if i == self.form_selected and self.is_editing:
-                    display_val = self.editing_text + "_"
-                surf = self.context.font.render(f"{label}: {display_val}", True, color)
-                self.context.screen.blit(surf, (bx + 20, y))
-            y += self.context.tile_size + 10
+        _draw_form_panel(self.form_panel, self.context, title, options, self.form_selected,
+                         self.is_editing, self.editing_text, max_w, total_h)
+        self.form_panel.blit(self.context.screen, (bx, by))
 
@@ -3,7 +3,7 @@ import sys
 from statemachine import StateMachine, State as SMState
 from state_engine import State
 from map_io import save_config
-from menu.base import _render_menu_generic, TextInputState
+from menu.base import _render_menu_generic, TextInputState, Panel
 
 class ControlSettingsMachine(StateMachine):
     browsing = SMState(initial=True)
@@ -14,6 +14,8 @@ class ControlSettingsMachine(StateMachine):
     cancel_capture = capturing.to(browsing)
 
 class ControlSettingsState(State):
+    opaque = True
+
     def __init__(self, manager, context, bindings):
         super().__init__(manager)
         self.context = context
@@ -22,6 +24,7 @@ class ControlSettingsState(State):
         self.actions = sorted(list(bindings.keys()))
         self.selected_idx = 0
         self.scroll_offset = 0
+        self.panel = Panel((0, 0, 0, 255))
 
     def handle_event(self, event):
         if self.machine.current_state == ControlSettingsMachine.browsing:
@@ -80,42 +83,51 @@ class ControlSettingsState(State):
             self.machine.finish_capture()
 
     def draw(self, surface):
-        self.context.screen.fill((0, 0, 0))
         font = self.context.font
         tile_size = self.context.tile_size
-        visible_actions = (self.context.height - 150) // tile_size
+        # Rows stop above the help line so the two never share panel bands
+        visible_actions = max(1, min((self.context.height - 150) // tile_size,
+                                     (self.context.height - 80 - (4 * tile_size + 10)) // tile_size))
         
         if self.selected_idx < self.scroll_offset:
             self.scroll_offset = self.selected_idx
         elif self.selected_idx >= self.scroll_offset + visible_actions:
             self.scroll_offset = self.selected_idx - visible_actions + 1
 
-        surface.blit(font.render("=== EDIT CONTROLS ===", True, (255, 255, 255)), (10, 10))
-        surface.blit(font.render("Action                          Key", True, (255, 255, 255)), (10, 2 * tile_size + 10))
-        surface.blit(font.render("-" * 50, True, (255, 255, 255)), (10, 3 * tile_size + 10))
+        width = self.context.width
+        panel = self.panel
+        if panel.begin((font, tile_size), (width, self.context.height)):
+            panel.surface.blit(font.render("=== EDIT CONTROLS ===", True, (255, 255, 255)), (10, 10))
+            panel.surface.blit(font.render("Action                          Key", True, (255, 255, 255)), (10, 2 * tile_size + 10))
+            panel.surface.blit(font.render("-" * 50, True, (255, 255, 255)), (10, 3 * tile_size + 10))
 
         y = 4 * tile_size + 10
         for i in range(visible_actions):
             idx = self.scroll_offset + i
-            if idx >= len(self.actions): break
-            action = self.actions[idx]
-            key_name = self.bindings[action]
-            line = f"{action:<30} {key_name}"
-
-            color = (255, 255, 255)
-            if idx == self.selected_idx:
-                pygame.draw.rect(surface, (60, 60, 60), (0, y, self.context.width, tile_size))
-                color = (255, 255, 0)
-
-            surface.blit(font.render(line, True, color), (10, y))
+            line = None
+            if idx < len(self.actions):
+                action = self.actions[idx]
+                line = f"{action:<30} {self.bindings[action]}"
+            selected = idx == self.selected_idx
+
+            def paint(surf, band, line=line, selected=selected):
+                if line is None: return
+                color = (255, 255, 255)
+                if selected:
+                    pygame.draw.rect(surf, (60, 60, 60), band)
+                    color = (255, 255, 0)
+                surf.blit(font.render(line, True, color), (10, band.y))
+            panel.row(i, (0, y, width, tile_size), (line, selected), paint)
             y += tile_size
 
         help_y = self.context.height - 80
         if self.machine.current_state == ControlSettingsMachine.browsing:
-            surface.blit(font.render("Up/Down: Select | Enter: Change | Q: Back", True, (0, 255, 0)), (10, help_y))
+            help_line, help_color = "Up/Down: Select | Enter: Change | Q: Back", (0, 255, 0)
         else:
-            action = self.actions[self.selected_idx]
-            surface.blit(font.render(f"Press new key for '{action}' (Esc to cancel)...", True, (255, 255, 0)), (10, help_y))
+            help_line, help_color = f"Press new key for '{self.actions[self.selected_idx]}' (Esc to cancel)...", (255, 255, 0)
+        panel.row("help", (0, help_y, width, tile_size + 10), help_line,
+                  lambda surf, band: surf.blit(font.render(help_line, True, help_color), (10, band.y)))
+        panel.blit(surface, (0, 0))
 
 class AutosaveSettingsState(State):
     def __init__(self, manager, context, tool_state):
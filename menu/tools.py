@@ -1,8 +1,11 @@
 import pygame
 from state_engine import State
 from tiles import REGISTRY
+from menu.base import Panel
 
 class BrushDefineState(State):
+    opaque = True
+
     def __init__(self, manager, context, callback):
         super().__init__(manager)
         self.context = context
@@ -10,6 +13,7 @@ class BrushDefineState(State):
         self.size = 3
         self.brush = [[False for _ in range(self.size)] for _ in range(self.size)]
         self.by, self.bx = 0, 0
+        self.panel = Panel((0, 0, 0, 255))
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -26,20 +30,22 @@ class BrushDefineState(State):
                 self.callback(None)
 
     def draw(self, surface):
-        self.context.screen.fill((0,0,0))
-        self.context.screen.blit(self.context.font.render(f"Brush {self.size}x{self.size} (Space=Toggle, Enter=Save)", True, (255,255,255)), (10,10))
+        font = self.context.font
+        if self.panel.begin(font, (self.context.width, self.context.height)):
+            self.panel.surface.blit(font.render(f"Brush {self.size}x{self.size} (Space=Toggle, Enter=Save)", True, (255,255,255)), (10,10))
         start_x, start_y = 50, 50
         cell_s = 30
         for r in range(self.size):
             for c in range(self.size):
                 rect = (start_x + c * cell_s, start_y + r * cell_s, cell_s, cell_s)
                 color = (200, 200, 200) if self.brush[r][c] else (50, 50, 50)
-                pygame.draw.rect(surface, color, rect)
-                pygame.draw.rect(surface, (255, 255, 255), rect, 1)
-                if r == self.by and c == self.bx:
-                    pygame.draw.rect(surface, (255, 0, 0), rect, 2)
+                cursor = r == self.by and c == self.bx
+                self.panel.row((r, c), rect, (color, cursor), lambda surf, rect, color=color, cursor=cursor: _draw_cell(surf, rect, color, cursor))
+        self.panel.blit(surface, (0, 0))
 
 class PatternDefineState(State):
+    opaque = True
+
     def __init__(self, manager, context, size, callback):
         super().__init__(manager)
         self.context = context
@@ -47,6 +53,7 @@ class PatternDefineState(State):
         self.callback = callback
         self.pattern = [['.' for _ in range(size)] for _ in range(size)]
         self.by, self.bx = 0, 0
+        self.panel = Panel((0, 0, 0, 255))
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -64,20 +71,26 @@ class PatternDefineState(State):
                 self.pattern[self.by][self.bx] = event.unicode
 
     def draw(self, surface):
-        self.context.screen.fill((0,0,0))
-        self.context.screen.blit(self.context.font.render(f"Pattern {self.size}x{self.size} (Enter char, Enter=Save)", True, (255,255,255)), (10,10))
+        font = self.context.font
+        if self.panel.begin(font, (self.context.width, self.context.height)):
+            self.panel.surface.blit(font.render(f"Pattern {self.size}x{self.size} (Enter char, Enter=Save)", True, (255,255,255)), (10,10))
         start_x, start_y = 50, 50
         cell_s = 30
         for r in range(self.size):
             for c in range(self.size):
                 rect = (start_x + c * cell_s, start_y + r * cell_s, cell_s, cell_s)
-                pygame.draw.rect(surface, (50, 50, 50), rect)
-                pygame.draw.rect(surface, (255, 255, 255), rect, 1)
-                if r == self.by and c == self.bx:
-                    pygame.draw.rect(surface, (255, 0, 0), rect, 2)
+                cursor = r == self.by and c == self.bx
                 glyph = self.context.get_glyph(REGISTRY.get_by_char(self.pattern[r][c]))
-                if glyph:
-                    surface.blit(glyph, (rect[0]+5, rect[1]+5))
+                self.panel.row((r, c), rect, (glyph, cursor), lambda surf, rect, glyph=glyph, cursor=cursor: _draw_cell(surf, rect, (50, 50, 50), cursor, glyph))
+        self.panel.blit(surface, (0, 0))
+
+def _draw_cell(surf, rect, color, cursor, glyph=None):
+    pygame.draw.rect(surf, color, rect)
+    pygame.draw.rect(surf, (255, 255, 255), rect, 1)
+    if cursor:
+        pygame.draw.rect(surf, (255, 0, 0), rect, 2)
+    if glyph:
+        surf.blit(glyph, (rect[0]+5, rect[1]+5))
 
 def menu_define_brush(context, callback):
     context.manager.push(BrushDefineState(context.manager, context, callback))
@@ -7,6 +7,8 @@ from map_io import load_config
 from editor_state import EditorState
 
 class MainMenuState(State):
+    opaque = True
+
     def __init__(self, manager, renderer):
         super().__init__(manager)
         self.renderer = renderer
@@ -0,0 +1,79 @@
+import numpy as np
+import pygame
+from tiles import REGISTRY
+
+class Minimap:
+    """Overview of the whole map, one pixel per factor x factor cells.
+
+    Colors come from REGISTRY.tables.flat, through the renderer's MipPyramid
+    when the map is too big for one pixel per cell. The image is kept as a
+    surface; edited cells are queued with mark_dirty and only their pixels
+    are rewritten before the next draw.
+    """
+    # Longest side of the minimap on screen, in pixels
+    MAX_SIZE = 200
+    # Beyond this many queued pixels the image is rebuilt instead of patched
+    MAX_PATCH_PIXELS = 4096
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.factor = 1  # map cells per image pixel along each axis
+        self.scale = 1  # screen pixels per image pixel
+        self.image = None  # one pixel per factor x factor cells
+        self.surface = None  # image scaled for the screen
+        self.key = None
+        self._dirty = set()
+
+    def mark_dirty(self, x=None, y=None):
+        if x is None or y is None:
+            self.key = None
+            self._dirty.clear()
+        elif self.key is not None:
+            self._dirty.add((x // self.factor, y // self.factor))
+
+    def _colors(self, map_obj, xs=None, ys=None):
+        """Image colors of the whole map, or of the pixels at (xs, ys)."""
+        if self.factor == 1:
+            data = map_obj.data if xs is None else map_obj.data[ys, xs]
+            return REGISTRY.tables.flat[data]
+        level = self.renderer.get_pyramid(map_obj).level(self.factor)
+        return level if xs is None else level[ys, xs]
+
+    def refresh(self, map_obj):
+        """Bring the image up to date with map_obj. Returns the screen surface."""
+        key = (map_obj.uid, map_obj.width, map_obj.height, REGISTRY.version)
+        if key != self.key or len(self._dirty) > self.MAX_PATCH_PIXELS:
+            self.factor = 1
+            while max(map_obj.width, map_obj.height) > self.MAX_SIZE * self.factor:
+                self.factor *= 2
+            self.scale = max(1, self.MAX_SIZE // max(map_obj.width, map_obj.height))
+            self.image = pygame.surfarray.make_surface(self._colors(map_obj).transpose(1, 0, 2))
+            self.key = key
+        elif self._dirty:
+            xs, ys = np.array(list(self._dirty)).T
+            pixels = pygame.surfarray.pixels3d(self.image)
+            pixels[xs, ys] = self._colors(map_obj, xs, ys)
+            del pixels
+        else:
+            return self.surface
+        self._dirty.clear()
+        w, h = self.image.get_size()
+        self.surface = pygame.transform.scale(self.image, (w * self.scale, h * self.scale)).convert()
+        return self.surface
+
+    def cells_to_px(self, cells):
+        return cells * self.scale // self.factor
+
+    def cell_at(self, rect, pos):
+        """Map cell under screen position pos on a minimap drawn at rect."""
+        return ((pos[0] - rect.x) * self.factor // self.scale,
+                (pos[1] - rect.y) * self.factor // self.scale)
+
+    def draw(self, screen, session, pos):
+        """Blit the minimap with the viewport outlined at pos. Returns its rect."""
+        rect = screen.blit(self.refresh(session.map_obj), pos)
+        view = pygame.Rect(rect.x + self.cells_to_px(session.camera_x), rect.y + self.cells_to_px(session.camera_y),
+                           max(2, self.cells_to_px(session.view_width)), max(2, self.cells_to_px(session.view_height)))
+        pygame.draw.rect(screen, (255, 255, 0), view.clip(rect), 1)
+        pygame.draw.rect(screen, (200, 200, 200), rect.inflate(2, 2), 1)
+        return rect
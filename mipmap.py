@@ -0,0 +1,76 @@
+import numpy as np
+from tiles import REGISTRY
+
+def _halve(img):
+    """Average 2x2 pixel blocks of an (h, w, 3) uint8 image; odd edges are replicated."""
+    h, w = img.shape[:2]
+    if h % 2 or w % 2:
+        img = np.pad(img, ((0, h % 2), (0, w % 2), (0, 0)), mode='edge')
+    acc = img[0::2, 0::2].astype(np.uint16)
+    acc += img[1::2, 0::2]
+    acc += img[0::2, 1::2]
+    acc += img[1::2, 1::2]
+    return (acc >> 2).astype(np.uint8)
+
+class MipPyramid:
+    """Downsampled flat-color images of a map for zoomed-out rendering.
+
+    Level `factor` (a power of two >= 2) is an image with one pixel per
+    factor x factor cells, averaging the cells' flat colors from
+    REGISTRY.tables. Levels are built lazily by halving the level below;
+    edited cells are queued with mark_dirty and patched on the next access.
+    """
+    # Rows of map data turned into colors at a time when building level 2
+    BAND_ROWS = 256
+    # Beyond this many queued cells the levels are dropped instead of patched
+    MAX_PATCH_CELLS = 4096
+
+    def __init__(self, map_obj):
+        self.map_obj = map_obj
+        self.levels = {}
+        self.tables_version = None
+        self._dirty = []
+
+    def mark_dirty(self, x=None, y=None):
+        if x is None or y is None:
+            self.levels = {}
+            self._dirty = []
+        elif self.levels:
+            self._dirty.append((x, y))
+
+    def level(self, factor):
+        if self.tables_version != REGISTRY.version:
+            self.levels = {}
+            self._dirty = []
+            self.tables_version = REGISTRY.version
+        if self._dirty:
+            self._apply_dirty()
+        if factor not in self.levels:
+            self.levels[factor] = self._build(factor)
+        return self.levels[factor]
+
+    def _build(self, factor):
+        if factor == 2:
+            flat = REGISTRY.tables.flat
+            data = self.map_obj.data
+            bands = []
+            # BAND_ROWS is even, so every band halves independently
+            for y0 in range(0, self.map_obj.height, self.BAND_ROWS):
+                bands.append(_halve(flat[data[y0:y0 + self.BAND_ROWS]]))
+            return np.concatenate(bands, axis=0)
+        return _halve(self.level(factor // 2))
+
+    def _apply_dirty(self):
+        flat = REGISTRY.tables.flat
+        data = self.map_obj.data
+        cells, self._dirty = self._dirty, []
+        if len(cells) > self.MAX_PATCH_CELLS:
+            # Cheaper to rebuild lazily than to patch block by block
+            self.levels = {}
+            return
+        for factor in sorted(self.levels):
+            img = self.levels[factor]
+            for bx, by in {(x // factor, y // factor) for x, y in cells}:
+                if by < img.shape[0] and bx < img.shape[1]:
+                    block = flat[data[by * factor:(by + 1) * factor, bx * factor:(bx + 1) * factor]]
+                    img[by, bx] = block.reshape(-1, 3).mean(axis=0).astype(np.uint8)
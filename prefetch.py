@@ -0,0 +1,128 @@
+import math
+import time
+
+class ChunkPrefetcher:
+    """Rasterizes chunks around the viewport ahead of camera movement, in spare frame time.
+
+    draw_map reports the visible chunk range and camera position through
+    `observe`; the prefetcher estimates the camera velocity and queues the
+    uncached chunks in a ring around the view, stretched in the direction of
+    motion. `run` builds queued chunks until its time budget is spent.
+
+    The ring only takes what the chunk cache's byte budget has room for next
+    to the visible chunks; otherwise, at large tile sizes, each prefetched
+    chunk would evict another one and the queue would never empty.
+
+    A visible chunk that was already built by the prefetcher counts as a hit,
+    one that draw_map had to build itself as a miss.
+    """
+    # Chunks of margin kept around the visible range in every direction
+    RING = 1
+    # How far ahead of the camera to look, in seconds of current motion
+    LOOKAHEAD_S = 0.5
+    MAX_LEAD = 4
+    # Velocity is forgotten when the camera has not moved for this long
+    IDLE_S = 0.3
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.queue = []
+        self.prefetched = set()
+        self.velocity = (0.0, 0.0)  # cells per second
+        self._last = None  # (time, cam_x, cam_y)
+        self.hits = 0
+        self.misses = 0
+        self.built = 0
+
+    def observe(self, session, visible):
+        """Update the velocity estimate and re-plan the queue. visible is (start_cx, start_cy, end_cx, end_cy)."""
+        now = time.perf_counter()
+        cam = (session.camera_x, session.camera_y)
+        if self._last is not None:
+            t, x, y = self._last
+            dt = now - t
+            if cam != (x, y) and dt > 0:
+                vx, vy = (cam[0] - x) / dt, (cam[1] - y) / dt
+                # Smooth out the jitter of key repeat and mouse drags
+                self.velocity = (0.5 * self.velocity[0] + 0.5 * vx, 0.5 * self.velocity[1] + 0.5 * vy)
+            elif dt > self.IDLE_S:
+                self.velocity = (0.0, 0.0)
+            if cam == (x, y):
+                now = t  # keep measuring from the last movement
+        self._last = (now, cam[0], cam[1])
+        self._plan(session, visible)
+
+    def note_visible(self, key, cached):
+        if cached:
+            if key in self.prefetched:
+                self.prefetched.discard(key)
+                self.hits += 1
+        else:
+            self.misses += 1
+
+    def _plan(self, session, visible):
+        r = self.renderer
+        span = r.chunk_span()
+        sx, sy, ex, ey = visible
+        vx, vy = self.velocity
+        lead_x = min(self.MAX_LEAD, math.ceil(abs(vx) * self.LOOKAHEAD_S / span))
+        lead_y = min(self.MAX_LEAD, math.ceil(abs(vy) * self.LOOKAHEAD_S / span))
+
+        x0 = sx - self.RING - (lead_x if vx < 0 else 0)
+        x1 = ex + self.RING + (lead_x if vx > 0 else 0)
+        y0 = sy - self.RING - (lead_y if vy < 0 else 0)
+        y1 = ey + self.RING + (lead_y if vy > 0 else 0)
+        max_cx = (session.map_obj.width - 1) // span
+        max_cy = (session.map_obj.height - 1) // span
+
+        zoom = r.zoom_key()
+        mid_x, mid_y = (sx + ex) / 2, (sy + ey) / 2
+        # Chunks of this zoom the budget holds (32-bit surfaces), less the visible ones and the ring already cached
+        chunk_px = r.cell_to_px(span)
+        room = r.chunk_cache.budget_bytes // max(1, chunk_px * chunk_px * 4) - (ex - sx + 1) * (ey - sy + 1)
+        queue = []
+        for cy in range(max(0, y0), min(max_cy, y1) + 1):
+            for cx in range(max(0, x0), min(max_cx, x1) + 1):
+                if sx <= cx <= ex and sy <= cy <= ey:
+                    continue  # draw_map builds visible chunks itself
+                if zoom + (cx, cy) in r.chunk_cache:
+                    room -= 1
+                    continue
+                # Chunks in the direction of motion first, then nearest to the view
+                ahead = (cx - mid_x) * vx + (cy - mid_y) * vy
+                queue.append((-ahead, max(abs(cx - mid_x), abs(cy - mid_y)), cx, cy))
+        queue.sort()
+        self.queue = [(cx, cy) for _, _, cx, cy in queue[:max(0, room)]]
+        # Forget prefetched chunks that have been evicted or belong to another zoom
+        self.prefetched = {k for k in self.prefetched if k in r.chunk_cache}
+
+    def pending(self):
+        return bool(self.queue)
+
+    def run(self, session, budget_ms):
+        """Build queued chunks until budget_ms is used up. Returns the number built."""
+        r = self.renderer
+        zoom = r.zoom_key()
+        deadline = time.perf_counter() + budget_ms / 1000
+        count = 0
+        while self.queue and time.perf_counter() < deadline:
+            cx, cy = self.queue.pop(0)
+            key = zoom + (cx, cy)
+            if key in r.chunk_cache:
+                continue
+            r._render_chunk(session.map_obj, cx, cy)
+            self.prefetched.add(key)
+            count += 1
+        self.built += count
+        return count
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.built = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "built": self.built,
+                "queued": len(self.queue), "hit_rate": self.hit_rate()}
@@ -0,0 +1,76 @@
+import time
+from collections import deque
+
+class FrameProfiler:
+    """Rolling per-phase timings of the last drawn frames, for the profiler HUD.
+
+    `lap(name)` charges the time since the previous lap to name, minus any time
+    recorded inside that stretch with `add`, so sequential phases use laps and
+    interleaved work (chunk builds inside the chunk loop) uses add. Every call
+    returns at once while disabled, so the hooks can stay in the main loop.
+    """
+    # Drawn frames kept for the averages and maxima
+    WINDOW = 60
+    # Display order; phases recorded under other names are listed after these
+    PHASES = ('events', 'ui update', 'update', 'other', 'chunk build', 'chunk blit', 'overlays',
+              'status', 'palette', 'ui draw', 'hud', 'flip')
+
+    def __init__(self, chunk_cache):
+        self.enabled = False
+        self.chunk_cache = chunk_cache
+        self.frames = deque(maxlen=self.WINDOW)  # (phase -> ms, total ms, chunk hits, chunk misses)
+        self.current = None
+        self._start = self._mark = 0.0
+        self._nested = 0.0
+        self._hits = self._misses = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        self.current = None
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self._start = self._mark = time.perf_counter()
+        self._nested = 0.0
+        self._hits, self._misses = self.chunk_cache.hits, self.chunk_cache.misses
+
+    def lap(self, name):
+        if self.current is None:
+            return
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + (now - self._mark) * 1000 - self._nested
+        self._mark = now
+        self._nested = 0.0
+
+    def add(self, name, ms):
+        if self.current is None:
+            return
+        self.current[name] = self.current.get(name, 0.0) + ms
+        self._nested += ms
+
+    def end(self):
+        """Close the frame opened by begin and add it to the window."""
+        if self.current is None:
+            return
+        total = (time.perf_counter() - self._start) * 1000
+        self.frames.append((self.current, total, self.chunk_cache.hits - self._hits,
+                            self.chunk_cache.misses - self._misses))
+        self.current = None
+
+    def summary(self):
+        """[(phase, avg ms, max ms)] over the window, then (frame avg ms, frame max ms, hits, misses per frame)."""
+        if not self.frames:
+            return [], (0.0, 0.0, 0.0, 0.0)
+        n = len(self.frames)
+        names = [p for p in self.PHASES if any(p in f[0] for f in self.frames)]
+        names += sorted({p for f in self.frames for p in f[0]} - set(names))
+        rows = []
+        for name in names:
+            values = [f[0].get(name, 0.0) for f in self.frames]
+            rows.append((name, sum(values) / n, max(values)))
+        totals = [f[1] for f in self.frames]
+        return rows, (sum(totals) / n, max(totals),
+                      sum(f[2] for f in self.frames) / n, sum(f[3] for f in self.frames) / n)
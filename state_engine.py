@@ -1,13 +1,32 @@
 import pygame
 import pygame_gui
 import sys
+import time
+import heapq
+import itertools
 from typing import Optional
 
 class State:
+    # When True, mouse motion does not force a full redraw; the state marks what changed itself
+    partial_motion_redraw = False
+    # Opaque states paint the whole screen, so nothing beneath them is drawn
+    opaque = False
+    # Only the top state is updated, so while a modal state is on top the states beneath it
+    # are drawn once into a snapshot that is reused until it closes or the window resizes
+    modal = True
+
     def __init__(self, manager):
         self.manager = manager
         self.ui_manager = manager.ui_manager
 
+    def mark_dirty(self, rect=None):
+        """Ask for a redraw of rect, or of the whole screen if rect is None."""
+        self.manager.request_redraw(rect, source=self)
+
+    def needs_update(self) -> bool:
+        """True while the state must keep ticking without input (held buttons, queued work, animations)."""
+        return False
+
     def enter(self, **kwargs):
         pass
 
@@ -34,23 +53,84 @@ class StateManager:
         self.ui_manager = pygame_gui.UIManager(screen.get_size())
         self.clock = pygame.time.Clock()
         self.notifications = []
+        # Redraw bookkeeping: a full redraw, or just these screen rects
+        self.full_redraw = True
+        self.dirty_rects = []
+        self.notification_rects = []
+        self.timers = []  # heap of (time, seq, rect) for scheduled redraws
+        self._timer_seq = itertools.count()
+        # Composite of the states beneath the top modal state, see _draw_states
+        self.snapshot = None
+        self.snapshot_key = None
+
+    def request_redraw(self, rect=None, source=None):
+        if source is not None and source is not self.current_state:
+            # A state under a modal changed: its frozen image is stale
+            self.invalidate_snapshot()
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.dirty_rects.append(pygame.Rect(rect))
+
+    def invalidate_snapshot(self):
+        self.snapshot = None
+        self.full_redraw = True
+
+    def schedule_redraw(self, delay, rect=None):
+        """Redraw after delay seconds even if no input arrives (animations, timeouts)."""
+        heapq.heappush(self.timers, (time.time() + delay, next(self._timer_seq), rect))
 
     def notify(self, text, duration=2.0, color=(0, 255, 0)):
-        import time
         self.notifications.append({
             "text": text,
             "expiry": time.time() + duration,
             "color": color
         })
+        self.request_redraw()
 
     def _update_notifications(self):
-        import time
         now = time.time()
-        self.notifications = [n for n in self.notifications if n["expiry"] > now]
+        alive = [n for n in self.notifications if n["expiry"] > now]
+        if len(alive) != len(self.notifications):
+            # Remaining notifications shift up, so the whole stack area changes
+            for rect in self.notification_rects:
+                self.request_redraw(rect)
+        self.notifications = alive
+
+    def _fire_timers(self):
+        now = time.time()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, rect = heapq.heappop(self.timers)
+            self.request_redraw(rect)
+
+    def _next_wakeup(self):
+        """Seconds until the next notification expiry or timer, or None to wait for input only."""
+        deadlines = [n["expiry"] for n in self.notifications]
+        if self.timers:
+            deadlines.append(self.timers[0][0])
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.time())
+
+    def _is_idle(self):
+        if self.full_redraw or self.dirty_rects:
+            return False
+        # Only the top state is updated, so work queued by the states beneath it cannot progress
+        return not (self.states and self.states[-1].needs_update())
+
+    def _wait_for_events(self):
+        """Block until input arrives or the next timer is due."""
+        wakeup = self._next_wakeup()
+        # Timed waits still wake up now and then so a late timer cannot stall the loop
+        timeout = 1000 if wakeup is None else max(1, int(wakeup * 1000) + 1)
+        event = pygame.event.wait(timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
 
     def push(self, state, **kwargs):
         self.states.append(state)
         state.enter(**kwargs)
+        self.request_redraw()
 
     def pop(self):
         if self.states:
@@ -58,6 +138,7 @@ class StateManager:
             top.exit()
             # Safety: Ensure text input is stopped
             pygame.key.stop_text_input()
+            self.request_redraw()
         if self.states:
             # Re-sync keys for the resuming state
             pass
@@ -81,33 +162,91 @@ class StateManager:
     def current_state(self):
         return self.states[-1] if self.states else None
 
+    def _draw_states(self):
+        states = self.states
+        base = 0
+        for i in range(len(states) - 1, -1, -1):
+            if states[i].opaque:
+                base = i
+                break
+        visible = states[base:]
+
+        if len(visible) < 2 or not visible[-1].modal:
+            self.snapshot = None
+            for state in visible:
+                state.draw(self.screen)
+            return
+
+        beneath = visible[:-1]
+        key = (tuple(id(state) for state in beneath), self.screen.get_size())
+        if self.snapshot is None or self.snapshot_key != key:
+            for state in beneath:
+                state.draw(self.screen)
+            self.snapshot = self.screen.copy()
+            self.snapshot_key = key
+        else:
+            self.screen.blit(self.snapshot, (0, 0))
+        visible[-1].draw(self.screen)
+
     def run(self, renderer):
         while self.running:
-            dt = self.clock.tick(60) / 1000.0
+            # Nothing to animate or redraw: sleep until input or the next timer instead of spinning
+            if self._is_idle():
+                events = self._wait_for_events()
+                dt = self.clock.tick() / 1000.0
+            else:
+                dt = self.clock.tick(60) / 1000.0
+                events = pygame.event.get()
+            # Phase timings for the profiler HUD; every call is a no-op while it is off
+            profiler = renderer.profiler
+            profiler.begin()
             self._update_notifications()
+            self._fire_timers()
             
             # Event Loop
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
                 
                 self.ui_manager.process_events(event)
                 
                 if self.states:
-                    self.states[-1].handle_event(event)
+                    top = self.states[-1]
+                    top.handle_event(event)
+                    if event.type != pygame.MOUSEMOTION or not top.partial_motion_redraw:
+                        self.request_redraw()
+            profiler.lap('events')
 
             # Update
             self.ui_manager.update(dt)
+            profiler.lap('ui update')
             if self.states:
                 self.states[-1].update(dt)
+            profiler.lap('update')
 
-            # Draw
-            for state in self.states:
-                state.draw(self.screen)
+            if not (self.full_redraw or self.dirty_rects):
+                continue
+
+            # Draw: states always paint the whole back buffer, only changed rects go to the display
+            self._draw_states()
+            profiler.lap('other')
             
-            renderer.draw_notifications(self.notifications)
+            rects = renderer.draw_notifications(self.notifications)
             self.ui_manager.draw_ui(self.screen)
-            pygame.display.flip()
+            profiler.lap('ui draw')
+            hud = renderer.draw_profiler()
+            if hud:
+                rects.append(hud)
+            profiler.lap('hud')
+            if self.full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.dirty_rects + rects)
+            profiler.lap('flip')
+            profiler.end()
+            self.notification_rects = rects
+            self.full_redraw = False
+            self.dirty_rects = []
             
         pygame.display.quit()
         pygame.quit()
@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, font, color, background)."""
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, bg=None):
+        key = (text, font, tuple(color), None if bg is None else tuple(bg))
+        surf = self._entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, True, color, bg)
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
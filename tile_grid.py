@@ -0,0 +1,99 @@
+import pygame
+from tiles import REGISTRY
+
+class TileGrid:
+    """Scrollable, searchable grid of tiles for the palette and the tile pickers.
+
+    Only the rows in view are painted, as rows of a retained menu Panel, with
+    glyphs blitted from a GlyphAtlas, so a frame costs the same for ten tiles
+    or ten thousand. `query` filters the tiles through REGISTRY.search.
+    """
+    def __init__(self, cols, spacing):
+        self.cols = max(1, cols)
+        self.spacing = spacing
+        self.query = ""
+        self.scroll = 0  # first visible row
+        self.tile_ids = []
+        self._key = None
+
+    def refresh(self):
+        """Re-run the search if the registry or the query changed. Returns the matching ids."""
+        key = (REGISTRY.version, self.query)
+        if key != self._key:
+            self.tile_ids = REGISTRY.search(self.query)
+            self._key = key
+        return self.tile_ids
+
+    def set_query(self, query):
+        self.query = query
+        self.scroll = 0
+        self.refresh()
+
+    def row_count(self):
+        return (len(self.tile_ids) + self.cols - 1) // self.cols
+
+    def scroll_by(self, rows, visible_rows):
+        self.scroll = max(0, min(self.row_count() - visible_rows, self.scroll + rows))
+
+    def ensure_visible(self, index, visible_rows):
+        row = index // self.cols
+        if row < self.scroll:
+            self.scroll = row
+        elif row >= self.scroll + visible_rows:
+            self.scroll = row - visible_rows + 1
+        self.scroll_by(0, visible_rows)
+
+    def index_at(self, x, y, visible_rows):
+        """Index into tile_ids of the cell at (x, y) relative to the grid origin, or -1."""
+        if x < 0 or y < 0:
+            return -1
+        col, row = x // self.spacing, y // self.spacing
+        if col >= self.cols or row >= visible_rows:
+            return -1
+        index = (self.scroll + row) * self.cols + col
+        return index if index < len(self.tile_ids) else -1
+
+    def draw(self, panel, atlas, origin, visible_rows, style=None):
+        """Paint the visible rows onto panel at origin (panel coordinates).
+
+        style(index, tile_id) returns (fill, outline) colors for a cell, either may be None.
+        Returns the clickable (rect, tile_id) pairs of the visible cells, in panel coordinates.
+        """
+        ox, oy = origin
+        sp = self.spacing
+        ts = atlas.tile_size
+        cells = []
+        for r in range(visible_rows):
+            start = (self.scroll + r) * self.cols
+            ids = tuple(self.tile_ids[start:start + self.cols])
+            styles = tuple(style(start + c, tid) for c, tid in enumerate(ids)) if style else ()
+            y = oy + r * sp
+            for c, tid in enumerate(ids):
+                cells.append((pygame.Rect(ox + c * sp, y, ts, ts), tid))
+
+            def paint(surf, band, ids=ids, styles=styles, y=y):
+                for c, tid in enumerate(ids):
+                    x = ox + c * sp
+                    fill, outline = styles[c] if styles else (None, None)
+                    if fill:
+                        pygame.draw.rect(surf, fill, (x - 2, y - 2, ts + 4, ts + 4))
+                    surf.blit(atlas.surface, (x, y), atlas.slot_rect(tid))
+                    if outline:
+                        pygame.draw.rect(surf, outline, (x - 2, y - 2, ts + 4, ts + 4), 2)
+            band = (ox - 2, y - 2, self.cols * sp, sp)
+            panel.row(("grid", r), band, (ids, styles, id(atlas), atlas.version), paint)
+
+        if self.row_count() > visible_rows:
+            # Scrollbar along the right edge of the grid
+            track_h = visible_rows * sp
+            thumb_h = max(8, track_h * visible_rows // self.row_count())
+            thumb_y = (track_h - thumb_h) * self.scroll // max(1, self.row_count() - visible_rows)
+            x = ox + self.cols * sp - 2
+
+            def paint_bar(surf, band):
+                pygame.draw.rect(surf, (80, 80, 80), band)
+                pygame.draw.rect(surf, (200, 200, 200), (band.x, band.y + thumb_y, band.w, thumb_h))
+            panel.row("scrollbar", (x, oy - 2, 4, track_h), (thumb_y, thumb_h), paint_bar)
+        else:
+            panel.row("scrollbar", (ox + self.cols * sp - 2, oy - 2, 4, visible_rows * sp), None, lambda surf, band: None)
+        return cells
@@ -1,14 +1,60 @@
+import json
+from bisect import bisect_left
+from contextlib import contextmanager
 from typing import List, Optional, Dict, Any, Tuple, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+import numpy as np
 import pygame
 
+# Map data is stored as uint16, so every lookup table covers the full id space
+# and can be indexed with raw map data without bounds checks.
+TABLE_SIZE = 1 << 16
+
 class TileAnimation(BaseModel):
     frames: List[int]  # List of tile IDs (or indices if self-referential)
     frame_duration: float = 0.2
     loop: bool = True
 
+    def frame_at(self, t: float) -> int:
+        """Index into frames of the frame shown t seconds into the animation."""
+        step = int(t / self.frame_duration) if self.frame_duration > 0 else 0
+        if self.loop:
+            return step % len(self.frames)
+        return min(step, len(self.frames) - 1)
+
+    def next_change(self, t: float) -> Optional[float]:
+        """Seconds from t until the next frame starts, or None if the animation has stopped."""
+        if self.frame_duration <= 0 or len(self.frames) < 2:
+            return None
+        step = int(t / self.frame_duration)
+        if not self.loop and step >= len(self.frames) - 1:
+            return None
+        return (step + 1) * self.frame_duration - t
+
+class TileSprite(BaseModel):
+    image: str  # Tileset image path, relative to the working directory like custom_tiles.json
+    x: int
+    y: int
+    w: int
+    h: int
+
+    def spec(self) -> str:
+        return f"{self.image} {self.x},{self.y},{self.w},{self.h}"
+
+    @classmethod
+    def parse_spec(cls, text: str) -> Optional["TileSprite"]:
+        """Parse "path x,y,w,h" as written by spec; None for empty or malformed text."""
+        try:
+            image, region = text.strip().rsplit(None, 1)
+            x, y, w, h = (int(v) for v in region.split(','))
+        except ValueError:
+            return None
+        if w <= 0 or h <= 0:
+            return None
+        return cls(image=image, x=x, y=y, w=w, h=h)
+
 class TileDefinition(BaseModel):
-    id: int
+    id: int = Field(ge=0, lt=TABLE_SIZE)  # indexes the compiled tables
     char: str
     name: str
     color: Union[str, Tuple[int, int, int]] = "white"
@@ -17,6 +63,142 @@ class TileDefinition(BaseModel):
     blocks_sight: bool = False
     properties: Dict[str, Any] = Field(default_factory=dict)
     animation: Optional[TileAnimation] = None
+    sprite: Optional[TileSprite] = None  # Drawn instead of the char when the image loads
+
+# Validates/dumps a whole tile list in one pydantic-core call instead of per model
+_TILE_LIST = TypeAdapter(List[TileDefinition])
+
+def load_tile_definitions(raw) -> List[TileDefinition]:
+    """Parse a tile file's raw JSON bytes, skipping malformed entries.
+
+    Like an unreadable or malformed file, which loads as no tiles, a bad entry is dropped silently.
+    """
+    try:
+        return _TILE_LIST.validate_json(raw)
+    except ValidationError:
+        pass
+
+    # Slow path: something in the file is off, validate entry by entry
+    try:
+        items = json.loads(raw)
+    except ValueError:
+        return []
+    tiles = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            tiles.append(TileDefinition.model_validate(item))
+        except ValidationError:
+            continue
+    return tiles
+
+def _table_color(color):
+    """color as an RGB triple for the tables; malformed colors fall back to white like unknown names."""
+    from utils import parse_color_name
+    try:
+        rgb = [int(c) for c in parse_color_name(color)]
+    except (TypeError, ValueError):
+        rgb = []
+    if len(rgb) < 3:
+        return (255, 255, 255)
+    return tuple(min(255, max(0, c)) for c in rgb[:3])
+
+class TileTables:
+    """Dense per-id arrays compiled from the registry, for vectorized gathers.
+
+    Index any array with map data directly, e.g. ``tables.fg[map_obj.data]``.
+    Ids without a definition have ``known == False``, a blank char and black colors.
+    """
+    def __init__(self, tiles: Dict[int, TileDefinition], version: int):
+        self.version = version
+        self.known = np.zeros(TABLE_SIZE, dtype=bool)
+        self.chars = np.full(TABLE_SIZE, ' ', dtype='<U1')
+        self.char_bytes = np.full(TABLE_SIZE, ord(' '), dtype=np.uint8)
+        self.fg = np.zeros((TABLE_SIZE, 3), dtype=np.uint8)
+        self.bg = np.zeros((TABLE_SIZE, 3), dtype=np.uint8)
+        self.has_bg = np.zeros(TABLE_SIZE, dtype=bool)
+        self.blocks_movement = np.zeros(TABLE_SIZE, dtype=bool)
+        self.blocks_sight = np.zeros(TABLE_SIZE, dtype=bool)
+        self.animated = np.zeros(TABLE_SIZE, dtype=bool)
+        self.animations: Dict[int, TileAnimation] = {}
+
+        for tid, t in tiles.items():
+            self.known[tid] = True
+            # char is not length-checked: an empty one shows as ' ', a longer one by its first char
+            char = t.char[:1] or ' '
+            self.chars[tid] = char
+            # Non-ASCII chars are kept in `chars`; the byte table falls back to '?'
+            self.char_bytes[tid] = ord(char) if ord(char) < 128 else ord('?')
+            self.fg[tid] = _table_color(t.color)
+            if t.bg_color is not None:
+                self.bg[tid] = _table_color(t.bg_color)
+                self.has_bg[tid] = True
+            self.blocks_movement[tid] = t.blocks_movement
+            self.blocks_sight[tid] = t.blocks_sight
+            if t.animation and t.animation.frames:
+                self.animated[tid] = True
+                self.animations[tid] = t.animation
+
+        # One representative color per tile for zoomed-out rendering: bg if set, else fg
+        self.flat = np.where(self.has_bg[:, None], self.bg, self.fg)
+        sprites = {tid: t.sprite for tid, t in tiles.items() if t.sprite is not None}
+        if sprites:
+            # Zoomed-out views show a sprite tile as the sprite's average color
+            from atlas import sprite_average_color
+            for tid, sprite in sprites.items():
+                avg = sprite_average_color(sprite)
+                if avg is not None:
+                    self.flat[tid] = avg
+        self.animated_ids = tuple(sorted(self.animations))
+
+    def animation_frame(self, tile_id, t):
+        """Tile id whose glyph an animated tile shows at time t; unknown frame ids show the tile itself."""
+        anim = self.animations[tile_id]
+        frame = anim.frames[anim.frame_at(t)]
+        return frame if 0 <= frame < TABLE_SIZE and self.known[frame] else tile_id
+
+    def color_of(self, tile_id):
+        return tuple(int(c) for c in self.fg[tile_id])
+
+    def bg_of(self, tile_id):
+        if not self.has_bg[tile_id]:
+            return None
+        return tuple(int(c) for c in self.bg[tile_id])
+
+class TileSearchIndex:
+    """Sorted prefix index over tile names, the words in them and tile chars.
+
+    A query is matched case-insensitively against the start of the full name or
+    of any word in it with two bisects, so search cost grows with the number of
+    matches rather than the registry size. A tile whose char is exactly the
+    query is listed first; the rest keep registry order.
+    """
+    def __init__(self, tiles: Dict[int, TileDefinition], version: int):
+        self.version = version
+        self.order = list(tiles)
+        self.rank = {tid: i for i, tid in enumerate(self.order)}
+        self.by_char = {t.char: tid for tid, t in tiles.items()}
+        entries = []
+        for tid, t in tiles.items():
+            name = t.name.lower()
+            entries.append((name, tid))
+            entries.extend((word, tid) for word in name.split()[1:])
+            entries.append((t.char.lower(), tid))
+        entries.sort()
+        self.keys = [k for k, _ in entries]
+        self.ids = [tid for _, tid in entries]
+
+    def search(self, query: str) -> List[int]:
+        if not query:
+            return list(self.order)
+        q = query.lower()
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + '\uffff', lo)
+        found = sorted(set(self.ids[lo:hi]), key=self.rank.__getitem__)
+        exact = self.by_char.get(query)
+        if exact is not None:
+            found.remove(exact)
+            found.insert(0, exact)
+        return found
 
 class TileRegistry:
     def __init__(self):
@@ -24,13 +206,69 @@ class TileRegistry:
         self._char_map: Dict[str, int] = {}
         self._next_id = 1  # 0 is usually reserved for "void" or "empty"
         self._subscribers = []
+        # Bumped on every mutation; compiled tables are rebuilt lazily when stale
+        self.version = 0
+        self._tables: Optional[TileTables] = None
+        self._search_index: Optional[TileSearchIndex] = None
+        # Batch state: saves and notifications are deferred until the outermost batch exits
+        self._batch_depth = 0
+        self._pending_save = False
+        self._pending_notify = False
+        self._pending_ids = set()
 
     def subscribe(self, callback):
+        """callback(tile_ids) gets the affected ids as a frozenset, or None if anything may have changed."""
         self._subscribers.append(callback)
 
-    def _notify(self):
+    def _notify(self, tile_ids=None):
         for callback in self._subscribers:
-            callback()
+            callback(tile_ids)
+
+    def _changed(self, persist=True, tile_ids=None):
+        self.version += 1
+        if self._batch_depth:
+            self._pending_save = self._pending_save or persist
+            self._pending_notify = True
+            if self._pending_ids is not None:
+                self._pending_ids = None if tile_ids is None else self._pending_ids | set(tile_ids)
+            return
+        if persist:
+            self.save_to_disk()
+        self._notify(None if tile_ids is None else frozenset(tile_ids))
+
+    @contextmanager
+    def batch(self):
+        """Coalesce disk writes and change notifications of many mutations into one.
+
+            with REGISTRY.batch():
+                for t in imported:
+                    REGISTRY.register(t.char, t.name, color=t.color)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                save, notify, ids = self._pending_save, self._pending_notify, self._pending_ids
+                self._pending_save = self._pending_notify = False
+                self._pending_ids = set()
+                if save:
+                    self.save_to_disk()
+                if notify:
+                    self._notify(None if ids is None else frozenset(ids))
+
+    @property
+    def tables(self) -> TileTables:
+        if self._tables is None or self._tables.version != self.version:
+            self._tables = TileTables(self._tiles, self.version)
+        return self._tables
+
+    def search(self, query: str) -> List[int]:
+        """Ids of tiles whose name, a word of the name or char starts with query."""
+        if self._search_index is None or self._search_index.version != self.version:
+            self._search_index = TileSearchIndex(self._tiles, self.version)
+        return self._search_index.search(query)
 
     def register(self, char: str, name: str, color="white", persist=True, **kwargs) -> int:
         if char in self._char_map:
@@ -42,17 +280,15 @@ class TileRegistry:
              tile = TileDefinition(id=tid, char=char, name=name, color=color, **kwargs)
              self._tiles[tid] = tile
              self._char_map[char] = tid
-        
-        if persist:
-            self.save_to_disk()
-        self._notify()
+
+        self._changed(persist, (tid,))
         return tid
 
     def save_to_disk(self):
         from map_io import save_tiles
         # Only persist non-default tiles or just persist all? 
         # For simplicity, we can save all tiles.
-        tile_data = [t.model_dump() for t in self._tiles.values()]
+        tile_data = _TILE_LIST.dump_python(list(self._tiles.values()), mode='json')
         save_tiles(tile_data)
 
     def delete(self, tile_id: int):
@@ -61,17 +297,19 @@ class TileRegistry:
             del self._tiles[tile_id]
             if char in self._char_map:
                 del self._char_map[char]
-            self.save_to_disk()
-            self._notify()
+            self._changed(tile_ids=(tile_id,))
 
-    def update_tile(self, tile_id: int, name: Optional[str] = None, color: Optional[Union[str, Tuple[int, int, int]]] = None):
+    def update_tile(self, tile_id: int, name: Optional[str] = None, color: Optional[Union[str, Tuple[int, int, int]]] = None,
+                    sprite: Union[TileSprite, None, bool] = False):
+        """Change the given fields; sprite=None removes the tile's sprite, False leaves it alone."""
         if tile_id in self._tiles:
             if name is not None:
                 self._tiles[tile_id].name = name
             if color is not None:
                 self._tiles[tile_id].color = color
-            self.save_to_disk()
-            self._notify()
+            if sprite is not False:
+                self._tiles[tile_id].sprite = sprite
+            self._changed(tile_ids=(tile_id,))
 
     def get(self, tile_id: int) -> Optional[TileDefinition]:
         return self._tiles.get(tile_id)
@@ -87,26 +325,27 @@ REGISTRY = TileRegistry()
 
 # Initialize defaults
 def init_default_tiles():
-    from map_io import load_tiles
-    custom_tiles = load_tiles()
-    
-    # Track which chars we already have
-    for t_data in custom_tiles:
-        # Pydantic v2 uses model_validate
-        tile = TileDefinition.model_validate(t_data)
-        REGISTRY._tiles[tile.id] = tile
-        REGISTRY._char_map[tile.char] = tile.id
-        if tile.id >= REGISTRY._next_id:
-            REGISTRY._next_id = tile.id + 1
-
-    # Ensure essential defaults exist if not already loaded
-    if '.' not in REGISTRY._char_map:
-        REGISTRY.register('.', "Floor", color="darkgray", persist=False)
-    if '#' not in REGISTRY._char_map:
-        REGISTRY.register('#', "Wall", color="lightgray", blocks_movement=True, blocks_sight=True, persist=False)
-    if '~' not in REGISTRY._char_map:
-        REGISTRY.register('~', "Water", color="blue", properties={"liquid": True}, persist=False)
-    if 'T' not in REGISTRY._char_map:
-        REGISTRY.register('T', "Tree", color="green", blocks_movement=True, persist=False)
-    if 'G' not in REGISTRY._char_map:
-        REGISTRY.register('G', "Grass", color="green", persist=False)
+    from map_io import load_tiles_raw
+    raw = load_tiles_raw()
+    custom_tiles = load_tile_definitions(raw) if raw else []
+
+    with REGISTRY.batch():
+        # Track which chars we already have
+        for tile in custom_tiles:
+            REGISTRY._tiles[tile.id] = tile
+            REGISTRY._char_map[tile.char] = tile.id
+            if tile.id >= REGISTRY._next_id:
+                REGISTRY._next_id = tile.id + 1
+        REGISTRY._changed(persist=False)
+
+        # Ensure essential defaults exist if not already loaded
+        if '.' not in REGISTRY._char_map:
+            REGISTRY.register('.', "Floor", color="darkgray", persist=False)
+        if '#' not in REGISTRY._char_map:
+            REGISTRY.register('#', "Wall", color="lightgray", blocks_movement=True, blocks_sight=True, persist=False)
+        if '~' not in REGISTRY._char_map:
+            REGISTRY.register('~', "Water", color="blue", properties={"liquid": True}, persist=False)
+        if 'T' not in REGISTRY._char_map:
+            REGISTRY.register('T', "Tree", color="green", blocks_movement=True, persist=False)
+        if 'G' not in REGISTRY._char_map:
+            REGISTRY.register('G', "Grass", color="green", persist=False)
@@ -5,16 +5,30 @@ import json
 import os
 from core import COLOR_MAP
 
-def get_all_colors():
-    combined = dict(COLOR_MAP)
+# colors.json is re-read only when its path or mtime changes
+_colors_cache = {"key": None, "colors": None}
+
+def _load_colors():
     colors_path = os.path.join(os.getcwd(), 'colors.json')
-    if os.path.exists(colors_path):
-        try:
-            with open(colors_path, 'r') as f:
-                loaded = json.load(f)
-                combined.update(loaded)
-        except: pass
-    return combined
+    try:
+        key = (colors_path, os.path.getmtime(colors_path))
+    except OSError:
+        key = (colors_path, None)
+
+    if _colors_cache["key"] != key or _colors_cache["colors"] is None:
+        combined = dict(COLOR_MAP)
+        if key[1] is not None:
+            try:
+                with open(colors_path, 'r') as f:
+                    loaded = json.load(f)
+                    combined.update(loaded)
+            except: pass
+        _colors_cache["key"] = key
+        _colors_cache["colors"] = combined
+    return _colors_cache["colors"]
+
+def get_all_colors():
+    return dict(_load_colors())
 
 def parse_color_name(name):
     # Returns an RGB tuple
@@ -27,7 +41,7 @@ def parse_color_name(name):
             return tuple(map(int, name.split(',')))
         except: pass
 
-    colors = get_all_colors()
+    colors = _load_colors()
     return tuple(colors.get(name.lower(), (255, 255, 255)))
 
 def get_color_name(rgb):
@@ -35,7 +49,7 @@ def get_color_name(rgb):
         return rgb
     
     try:
-        colors = get_all_colors()
+        colors = _load_colors()
         # Convert to list for comparison
         target = list(rgb)
         for name, val in colors.items():
@@ -1,52 +1,270 @@
 import pygame
 import sys
 import time
+import math
+import numpy as np
+from collections import OrderedDict
 from utils import get_key_name, get_distance
 from drawing import get_line_points, get_rect_points, get_circle_points
 from tiles import REGISTRY
-from core import COLOR_MAP
+from atlas import GlyphAtlas
+from chunk_cache import ChunkCache
+from mipmap import MipPyramid
+from minimap import Minimap
+from prefetch import ChunkPrefetcher
+from profiler import FrameProfiler
+from text_cache import TextCache
+from tile_grid import TileGrid
+from menu.base import Panel
 
 class Renderer:
+    # Below this many pixels per cell, cells are drawn as flat colors instead of glyphs
+    PIXEL_MODE_BELOW = 8
+    MAX_MIP = 256
+    # Time per frame spent building chunks that have a placeholder from another zoom level
+    BUILD_BUDGET_MS = 8
+    # Height of the status panel drawn at session.status_y
+    STATUS_PANEL_H = 110
+    # A cached chunk with more edited cells than this in one batch is rebuilt instead of patched
+    PATCH_MAX_CELLS = 256
+    # Glyph atlases kept for the most recently used tile sizes
+    MAX_ATLASES = 4
+    # Cell size of palette and picker glyphs, which do not follow the map zoom
+    UI_GLYPH = 24
+    # Render quality levels, stepped by note_frame against frame_budget_ms. Below full quality
+    # measurement grid labels are skipped, and chunks past the build budget are shown as flat
+    # colors and built over later frames, with less build time per frame at each level.
+    QUALITY_LOW, QUALITY_REDUCED, QUALITY_FULL = 0, 1, 2
+    QUALITY_NAMES = ('LOW', 'REDUCED', 'FULL')
+    # Frames between quality steps, and the share of the budget a frame must stay under to step up
+    QUALITY_COOLDOWN = 10
+    QUALITY_HEADROOM = 0.5
+    # Seconds between refreshes of the status bar's frame time while quality is unchanged
+    FRAME_LABEL_REFRESH = 0.25
+    # Seconds between refreshes of the profiler HUD's numbers
+    PROFILER_REFRESH = 0.25
+
     def __init__(self, screen, tile_size=20):
         self.tile_size = tile_size
+        # Cells per screen pixel when zoomed out past 1 px per cell (tile_size is then 1)
+        self.mip = 1
         self.screen = screen
         self.width, self.height = screen.get_size()
         
+        # UI text keeps a fixed size; map glyphs use a font per tile size, see get_map_font
         self.font_size = 20
-        try:
-            self.font = pygame.font.SysFont("Courier New", self.font_size, bold=True)
-            if not self.font:
-                self.font = pygame.font.SysFont("monospace", self.font_size, bold=True)
-        except:
-            self.font = pygame.font.Font(None, self.font_size)
+        self.font = self._load_font(self.font_size)
+        self.map_fonts = {}
+        self.big_font = None
+        self.text_cache = TextCache()
+        # Composed status panel and the inputs it was built from
+        self.status_surface = None
+        self.status_key = None
+        # Cached overlay layers and the inputs they were composed from, see _draw_overlays
+        self.highlight_surface = None
+        self.highlight_pos = (0, 0)
+        self.highlight_key = None
+        self.grid_surface = None
+        self.grid_key = None
+        # Last tool preview overlay and the inputs it was drawn for
+        self.preview_surface = None
+        self.preview_pos = (0, 0)
+        self.preview_key = None
+        # Smoothed cost of the editor's frames against the target, see note_frame
+        self.frame_budget_ms = 1000 / 60
+        self.frame_ms = 0.0
+        self.quality = self.QUALITY_FULL
+        self.quality_frames = 0  # frames since the last quality step
+        # FRAME label of the status bar and the (quality, time) it was rendered at
+        self.frame_label = None
+        self.frame_label_key = None
             
         self.glyph_cache = {}
-        self.chunk_cache = {} # (chunk_x, chunk_y) -> Surface
+        # (map uid, tile_size, mip, chunk_x, chunk_y) -> Surface, plus a bool array indexed by tile id marking the ids in the chunk
+        self.chunk_cache = ChunkCache()
         self.chunk_size = 32
+        # The map being drawn; chunk keys start with its uid so open maps share one cache and budget
+        self.map_obj = None
+        self.map_key = None
+        # Chunk key prefixes (map_key, tile_size, mip) that have had chunks cached
+        self.cached_zooms = set()
+        # Scaled stand-ins for chunks that are not built yet, keyed like chunk_cache. They are outside
+        # the chunk cache budget, so draw_map keeps only the ones of chunks in view.
+        self.placeholders = {}
+        self.pending_chunks = 0
+        self.prefetcher = ChunkPrefetcher(self)
+        # Time per frame the editor may spend prefetching chunks around the view
+        self.prefetch_budget_ms = 4
+        # Edited (x, y) cells waiting to be patched into cached chunks, see apply_patches
+        self.patch_queue = set()
+        self.atlases = OrderedDict()  # tile_size -> GlyphAtlas, least recently used first
+        self.ui_atlas = None
+        self.pyramids = {}  # map uid -> MipPyramid
+        self.minimap = Minimap(self)
+        # Animated tiles: clock origin, the {tile_id: frame} patched into each cached chunk,
+        # animated cells grouped by chunk, and seconds until the next visible frame change
+        self.anim_start = time.perf_counter()
+        self.anim_applied = {}
+        self.anim_groups = {}
+        self.anim_groups_key = None
+        self.next_animation = None
+        self.palette = TileGrid(5, 35)
+        self.palette_panel = Panel((30, 30, 30, 230), (200, 200, 200))
+        self.palette_selected = None
+        # Phase timings of recent frames and the HUD showing them, see draw_profiler
+        self.profiler = FrameProfiler(self.chunk_cache)
+        self.profiler_font = None
+        self.profiler_surface = None
+        self.profiler_time = 0.0
         
         # Subscribe to tile changes
-        REGISTRY.subscribe(self.invalidate_cache)
+        REGISTRY.subscribe(self._on_registry_change)
 
     def draw_notifications(self, notifications):
-        """Purely visual: takes a list of active notification objects and draws them."""
+        """Purely visual: takes a list of active notification objects, draws them and returns their rects."""
         y = 10
         now = time.time()
+        rects = []
         for n in notifications:
             time_left = n["expiry"] - now
             alpha = int(min(1.0, time_left / 0.5) * 255)
-            surf = self.font.render(n["text"], True, n["color"])
-            self.screen.blit(surf, (self.width - surf.get_width() - 10, y))
+            surf = self.text_cache.render(self.font, n["text"], n["color"])
+            rects.append(self.screen.blit(surf, (self.width - surf.get_width() - 10, y)))
             y += surf.get_height() + 5
+        return rects
+
+    @staticmethod
+    def _load_font(size):
+        try:
+            font = pygame.font.SysFont("Courier New", size, bold=True)
+            if not font:
+                font = pygame.font.SysFont("monospace", size, bold=True)
+        except:
+            font = pygame.font.Font(None, size)
+        return font
+
+    def get_map_font(self, tile_size):
+        font = self.map_fonts.get(tile_size)
+        if font is None:
+            font = self.map_fonts[tile_size] = self._load_font(tile_size)
+        return font
 
     def invalidate_cache(self):
         self.glyph_cache = {}
-        self.chunk_cache = {}
+        self.chunk_cache.clear()
+        self.cached_zooms.clear()
+        self.placeholders.clear()
+        self.patch_queue.clear()
+        self.anim_applied.clear()
+        if self.pyramid:
+            self.pyramid.mark_dirty()
+        self.minimap.mark_dirty()
+
+    def forget_map(self, map_key):
+        """Drop everything cached for one map, after a whole-map change or when it is closed."""
+        for key in [k for k in self.chunk_cache.keys() if k[0] == map_key]:
+            self.chunk_cache.pop(key)
+        self.placeholders = {k: v for k, v in self.placeholders.items() if k[0] != map_key}
+        self.anim_applied = {k: v for k, v in self.anim_applied.items() if k[0] != map_key}
+        self.cached_zooms = {z for z in self.cached_zooms if z[0] != map_key}
+        self.pyramids.pop(map_key, None)
+        if map_key == self.map_key:
+            self.patch_queue.clear()
+            self.minimap.mark_dirty()
+
+    def set_map(self, map_obj):
+        """Make map_obj the map that is drawn and edited. Chunks of other maps stay cached until evicted."""
+        if map_obj is self.map_obj:
+            return
+        if self.map_obj is not None:
+            # Edits queued for the previous map go into its chunks while its key is current
+            self.apply_patches(self.map_obj.data)
+        self.map_obj, self.map_key = map_obj, map_obj.uid
+        self.minimap.mark_dirty()
+
+    @property
+    def pyramid(self):
+        return self.pyramids.get(self.map_key)
 
     def invalidate_chunk(self, map_x, map_y):
-        cx = map_x // self.chunk_size
-        cy = map_y // self.chunk_size
-        if (cx, cy) in self.chunk_cache:
-            del self.chunk_cache[(cx, cy)]
+        # The cell is in one chunk per cached zoom level of the current map
+        for zoom in self.cached_zooms:
+            if zoom[0] != self.map_key:
+                continue
+            span = self.chunk_size * zoom[2]
+            key = zoom + (map_x // span, map_y // span)
+            self.chunk_cache.pop(key)
+            self.placeholders.pop(key, None)
+        if self.pyramid:
+            self.pyramid.mark_dirty(map_x, map_y)
+        self.minimap.mark_dirty(map_x, map_y)
+
+    def queue_cell(self, map_x, map_y):
+        """Record an edited cell; cached chunks are patched in one batch before the next draw."""
+        self.patch_queue.add((map_x, map_y))
+        if self.pyramid:
+            self.pyramid.mark_dirty(map_x, map_y)
+        self.minimap.mark_dirty(map_x, map_y)
+
+    def apply_patches(self, map_data):
+        if not self.patch_queue:
+            return
+        cells, self.patch_queue = self.patch_queue, set()
+        for zoom in self.cached_zooms:
+            if zoom[0] != self.map_key:
+                continue
+            span = self.chunk_size * zoom[2]
+            by_chunk = {}
+            for x, y in cells:
+                by_chunk.setdefault((x // span, y // span), []).append((x, y))
+            for (cx, cy), chunk_cells in by_chunk.items():
+                key = zoom + (cx, cy)
+                self.placeholders.pop(key, None)
+                if key not in self.chunk_cache:
+                    continue
+                # Mip chunks are cheap slices of the (already patched) pyramid, so just rebuild those
+                if zoom[2] > 1 or len(chunk_cells) > self.PATCH_MAX_CELLS or not self._patch_chunk(key, chunk_cells, map_data):
+                    self.chunk_cache.pop(key)
+
+    def _patch_chunk(self, key, cells, map_data):
+        """Redraw only the given cells of a cached chunk in place. Returns False if it must be rebuilt."""
+        _, ts, _, cx, cy = key
+        surf = self.chunk_cache[key]
+        ox, oy = cx * self.chunk_size, cy * self.chunk_size
+        ids = [int(map_data[y, x]) for x, y in cells]
+
+        if ts < self.PIXEL_MODE_BELOW:
+            flat = REGISTRY.tables.flat
+            for (x, y), tid in zip(cells, ids):
+                surf.fill(flat[tid], ((x - ox) * ts, (y - oy) * ts, ts, ts))
+        else:
+            atlas = self.atlases.get(ts)
+            if atlas is None or atlas.is_stale():
+                return False
+            # Atlas cells carry their background, so one blit replaces the whole cell
+            for (x, y), tid in zip(cells, ids):
+                surf.blit(atlas.surface, ((x - ox) * ts, (y - oy) * ts), atlas.slot_rect(tid))
+
+        self.chunk_cache.add_tiles(key, ids)
+        # Patched cells are back to their first frame
+        self.anim_applied.pop(key, None)
+        return True
+
+    def invalidate_tiles(self, tile_ids):
+        """Evict only the glyphs of tile_ids and the cached chunks that contain any of them."""
+        for key in [k for k in self.glyph_cache if k[0] in tile_ids]:
+            del self.glyph_cache[key]
+
+        for key, present in self.chunk_cache.items_with_tiles():
+            if present is None or any(tid < len(present) and present[tid] for tid in tile_ids):
+                self.chunk_cache.pop(key)
+        self.placeholders.clear()
+
+    def _on_registry_change(self, tile_ids):
+        if tile_ids is None:
+            self.invalidate_cache()
+        else:
+            self.invalidate_tiles(tile_ids)
 
     def get_glyph(self, tile_id, bg_color=None):
         # Optimized lookup
@@ -54,20 +272,11 @@ class Renderer:
         if key in self.glyph_cache:
             return self.glyph_cache[key]
 
-        tile_def = REGISTRY.get(tile_id)
-        if not tile_def:
+        tables = REGISTRY.tables
+        if not tables.known[tile_id]:
             return None
-        
-        char = tile_def.char
-        
-        # Handle color parsing
-        color_val = tile_def.color
-        if isinstance(color_val, str):
-            color = COLOR_MAP.get(color_val.lower(), (255, 255, 255))
-        else:
-            color = color_val
 
-        surf = self.font.render(char, True, color, bg_color)
+        surf = self.font.render(str(tables.chars[tile_id]), True, tables.color_of(tile_id), bg_color)
         self.glyph_cache[key] = surf
         return surf
 
@@ -82,68 +291,438 @@ class Renderer:
         w, h = self.screen.get_size()
         self.width, self.height = w, h
 
-    def _render_chunk(self, session, cx, cy):
-        ts = self.tile_size
-        surf = pygame.Surface((self.chunk_size * ts, self.chunk_size * ts))
-        surf.fill((0, 0, 0))
-        
+    @property
+    def pixel_mode(self):
+        return self.tile_size < self.PIXEL_MODE_BELOW or self.mip > 1
+
+    def chunk_span(self):
+        """Map cells covered by one side of a chunk at the current zoom."""
+        return self.chunk_size * self.mip
+
+    def cell_to_px(self, cells):
+        return (cells * self.tile_size) // self.mip
+
+    def px_to_cell(self, px):
+        return (px * self.mip) // self.tile_size
+
+    def view_cells(self, px_w, px_h):
+        return self.px_to_cell(px_w), self.px_to_cell(px_h)
+
+    def cell_rect(self, session, x, y, w=1, h=1):
+        """Screen rect covered by a block of map cells at the current camera and zoom."""
+        px, py = self.cell_to_px(x - session.camera_x), self.cell_to_px(y - session.camera_y)
+        return pygame.Rect(px, py, max(1, self.cell_to_px(w)), max(1, self.cell_to_px(h)))
+
+    def zoom(self, direction, map_obj, viewport_px):
+        """Step the zoom ladder: ..., 6, 4, 2, 1 px per cell, then 2, 4, 8, ... cells per px.
+
+        Zooming out stops once the whole map fits in viewport_px. Returns True if the zoom changed.
+        """
+        old = (self.tile_size, self.mip)
+        if direction > 0:
+            if self.mip > 1:
+                self.mip //= 2
+            elif self.tile_size == 1:
+                self.tile_size = 2
+            else:
+                self.tile_size = min(100, self.tile_size + 2)
+        else:
+            if self.tile_size > 2:
+                self.tile_size -= 2
+            elif self.tile_size == 2:
+                self.tile_size = 1
+            else:
+                vw, vh = viewport_px
+                fits = map_obj.width <= vw * self.mip and map_obj.height <= vh * self.mip
+                if not fits and self.mip < self.MAX_MIP:
+                    self.mip *= 2
+        if (self.tile_size, self.mip) == old:
+            return False
+        # Chunks of other levels stay cached (keyed by zoom) and serve as placeholders
+        self.placeholders.clear()
+        return True
+
+    def note_frame(self, ms):
+        """Record what a frame cost; step quality down while over budget and back up once there is headroom."""
+        self.frame_ms = ms if not self.frame_ms else 0.7 * self.frame_ms + 0.3 * ms
+        self.quality_frames += 1
+        if self.quality_frames < self.QUALITY_COOLDOWN:
+            return
+        if self.frame_ms > self.frame_budget_ms and self.quality > self.QUALITY_LOW:
+            self.quality -= 1
+        elif self.frame_ms < self.frame_budget_ms * self.QUALITY_HEADROOM and self.quality < self.QUALITY_FULL:
+            self.quality += 1
+        else:
+            return
+        self.quality_frames = 0
+
+    def quality_settling(self):
+        """True while below full quality and the next few frames may show the headroom to step back up."""
+        return self.quality < self.QUALITY_FULL and self.quality_frames < 2 * self.QUALITY_COOLDOWN
+
+    def zoom_key(self):
+        """Prefix of the chunk keys of the current map and zoom level."""
+        return (self.map_key, self.tile_size, self.mip)
+
+    def zoom_label(self):
+        return f"1:{self.mip}" if self.mip > 1 else f"{self.tile_size}px"
+
+    def get_pyramid(self, map_obj):
+        pyramid = self.pyramids.get(map_obj.uid)
+        if pyramid is None:
+            pyramid = self.pyramids[map_obj.uid] = MipPyramid(map_obj)
+        return pyramid
+
+    def get_atlas(self):
+        atlas = self.atlases.get(self.tile_size)
+        if atlas is None or atlas.is_stale():
+            atlas = self.atlases[self.tile_size] = GlyphAtlas(self.get_map_font(self.tile_size), self.tile_size)
+            atlas.build()
+            if len(self.atlases) > self.MAX_ATLASES:
+                # Chunks cached at an evicted size are rebuilt instead of patched, see _patch_chunk
+                self.atlases.popitem(last=False)
+        self.atlases.move_to_end(self.tile_size)
+        return atlas
+
+    def get_ui_atlas(self):
+        """Atlas of UI font glyphs for the palette and tile pickers."""
+        if self.ui_atlas is None or self.ui_atlas.is_stale():
+            self.ui_atlas = GlyphAtlas(self.font, self.UI_GLYPH)
+            self.ui_atlas.build()
+        return self.ui_atlas
+
+    def _cache_chunk(self, cx, cy, surf, tiles):
+        zoom = self.zoom_key()
+        self.chunk_cache.put(zoom + (cx, cy), surf, tiles)
+        self.cached_zooms.add(zoom)
+        self.placeholders.pop(zoom + (cx, cy), None)
+
+    def _placeholder(self, cx, cy):
+        """Stand-in for chunk (cx, cy) scaled from chunks cached at the nearest other zoom level."""
+        key = self.zoom_key() + (cx, cy)
+        if key in self.placeholders:
+            return self.placeholders[key]
+
+        span = self.chunk_span()
+        x0, y0 = cx * span, cy * span
+        scale = self.tile_size / self.mip
+        size = self.cell_to_px(span)
+        candidates = [z for z in self.cached_zooms
+                      if z[0] == self.map_key and z != self.zoom_key() and self.chunk_size * z[2] * 4 >= span]
+        candidates.sort(key=lambda z: abs(math.log2((z[1] / z[2]) / scale)))
+
+        surf = None
+        for _, ts, mip in candidates:
+            pspan = self.chunk_size * mip
+            for pcy in range(y0 // pspan, (y0 + span - 1) // pspan + 1):
+                for pcx in range(x0 // pspan, (x0 + span - 1) // pspan + 1):
+                    key = (self.map_key, ts, mip, pcx, pcy)
+                    if key not in self.chunk_cache:
+                        continue
+                    src = self.chunk_cache[key]
+                    # Overlap of the two chunks in map cells
+                    ix0, iy0 = max(x0, pcx * pspan), max(y0, pcy * pspan)
+                    ix1, iy1 = min(x0 + span, (pcx + 1) * pspan), min(y0 + span, (pcy + 1) * pspan)
+                    src_rect = pygame.Rect(((ix0 - pcx * pspan) * ts) // mip, ((iy0 - pcy * pspan) * ts) // mip,
+                                           ((ix1 - ix0) * ts) // mip, ((iy1 - iy0) * ts) // mip).clip(src.get_rect())
+                    dest = pygame.Rect(self.cell_to_px(ix0 - x0), self.cell_to_px(iy0 - y0),
+                                       self.cell_to_px(ix1 - ix0), self.cell_to_px(iy1 - iy0))
+                    if not src_rect.w or not src_rect.h or not dest.w or not dest.h:
+                        continue
+                    if surf is None:
+                        surf = pygame.Surface((size, size))
+                    part = src.subsurface(src_rect)
+                    try:
+                        part = pygame.transform.smoothscale(part, dest.size)
+                    except ValueError:
+                        part = pygame.transform.scale(part, dest.size)
+                    surf.blit(part, dest)
+            if surf is not None:
+                break
+
+        if surf is not None:
+            self.placeholders[self.zoom_key() + (cx, cy)] = surf
+        return surf
+
+    def _draw_flat_chunk(self, session, cx, cy, pos):
+        """Draw glyph chunk (cx, cy) at pos with each cell a block of its tile's flat color.
+
+        Scaled straight onto the screen and not cached: it is only shown until the chunk is built.
+        """
+        cs, ts = self.chunk_size, self.tile_size
+        data = session.map_obj.data[cy * cs : (cy + 1) * cs, cx * cs : (cx + 1) * cs]
+        rect = pygame.Rect(pos, (data.shape[1] * ts, data.shape[0] * ts))
+        dest = rect.clip(self.screen.get_clip())
+        if not dest.w or not dest.h:
+            return
+        # Only the cells on screen; partly visible edge cells are squeezed into what is left of them
+        x0, y0 = (dest.x - rect.x) // ts, (dest.y - rect.y) // ts
+        x1, y1 = -(-(dest.right - rect.x) // ts), -(-(dest.bottom - rect.y) // ts)
+        colors = REGISTRY.tables.flat[data[y0:y1, x0:x1]]
+        pygame.transform.scale(pygame.surfarray.make_surface(colors.transpose(1, 0, 2)), dest.size,
+                               self.screen.subsurface(dest))
+
+    def _render_pixel_chunk(self, map_obj, cx, cy):
+        cs = self.chunk_size
+        if self.mip == 1:
+            data = map_obj.data[cy * cs : (cy + 1) * cs, cx * cs : (cx + 1) * cs]
+            colors = REGISTRY.tables.flat[data]
+            tiles = np.bincount(data.ravel()) > 0
+        else:
+            # One pixel per mip x mip cells from the pyramid; tile presence is not tracked
+            colors = self.get_pyramid(map_obj).level(self.mip)[cy * cs : (cy + 1) * cs, cx * cs : (cx + 1) * cs]
+            tiles = None
+
+        surf = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        if self.tile_size > 1:
+            h, w = colors.shape[:2]
+            surf = pygame.transform.scale(surf, (w * self.tile_size, h * self.tile_size))
+        surf = surf.convert()
+        self._cache_chunk(cx, cy, surf, tiles)
+        return surf
+
+    def _animation_state(self, session):
+        """(cells by chunk, {tile_id: current frame id}, atlas) for animating visible chunks, or None."""
+        map_obj = session.map_obj
+        cells = map_obj.animated_cells()
+        if not cells:
+            return None
+        key = (map_obj.uid, map_obj.animated_version, self.chunk_size)
+        if self.anim_groups_key != key:
+            # {(cx, cy): {tile_id: (xs, ys) within the chunk}}
+            cs = self.chunk_size
+            groups = {}
+            for tid, coords in cells.items():
+                for x, y in coords:
+                    groups.setdefault((x // cs, y // cs), {}).setdefault(tid, []).append((x % cs, y % cs))
+            for chunk_cells in groups.values():
+                for tid, coords in chunk_cells.items():
+                    chunk_cells[tid] = tuple(np.array(coords, dtype=np.intp).T)
+            self.anim_groups, self.anim_groups_key = groups, key
+        tables = REGISTRY.tables
+        t = time.perf_counter() - self.anim_start
+        frames = {tid: tables.animation_frame(tid, t) for tid, coords in cells.items() if coords}
+        return self.anim_groups, frames, self.get_atlas(), t, set()
+
+    def _animate_chunk(self, key, surf, anim):
+        """Blit the current frame over the animated cells of a chunk whose tiles changed frame since last time."""
+        groups, frames, atlas, _, seen = anim
+        chunk_cells = groups.get(key[3:])
+        if not chunk_cells:
+            return
+        applied_surf, applied = self.anim_applied.get(key, (None, None))
+        if applied_surf is not surf:
+            # Freshly built chunks show every tile's first frame
+            applied = {}
+            self.anim_applied[key] = (surf, applied)
+        ts = key[1]
+        view = None
+        span = np.arange(ts)
+        for tid, (xs, ys) in chunk_cells.items():
+            seen.add(tid)
+            frame = frames[tid]
+            if applied.get(tid, tid) == frame:
+                continue
+            if view is None:
+                view = pygame.surfarray.pixels2d(surf).T  # (y, x) view of the surface memory
+            # Scatter the frame's atlas pixels into every cell at once: (cells, ts_y, ts_x)
+            rows = (ys[:, None] * ts + span)[:, :, None]
+            cols = (xs[:, None] * ts + span)[:, None, :]
+            view[rows, cols] = atlas.pixels[atlas.slots[frame]]
+            applied[tid] = frame
+        del view  # releases the surface lock
+
+    def _finish_animation(self, anim):
+        if anim is None:
+            self.next_animation = None
+            return
+        _, _, _, t, seen = anim
+        animations = REGISTRY.tables.animations
+        delays = [d for d in (animations[tid].next_change(t) for tid in seen) if d is not None]
+        self.next_animation = min(delays) if delays else None
+        if len(self.anim_applied) > len(self.chunk_cache):
+            # Drop the state of evicted chunks
+            self.anim_applied = {k: v for k, v in self.anim_applied.items() if k in self.chunk_cache and self.chunk_cache[k] is v[0]}
+
+    def _render_chunk(self, map_obj, cx, cy):
+        if self.pixel_mode:
+            return self._render_pixel_chunk(map_obj, cx, cy)
+
         start_x = cx * self.chunk_size
         start_y = cy * self.chunk_size
         
         # Get slice of map data
-        data = session.map_obj.data[start_y : start_y + self.chunk_size, start_x : start_x + self.chunk_size]
-        
-        for y_rel, row in enumerate(data):
-            py = y_rel * ts
-            for x_rel, tid in enumerate(row):
-                px = x_rel * ts
-                glyph = self.get_glyph(tid)
-                if glyph:
-                    surf.blit(glyph, (px, py))
-        
+        data = map_obj.data[start_y : start_y + self.chunk_size, start_x : start_x + self.chunk_size]
+
+        # Compose the whole chunk from the glyph atlas with numpy gathers
+        surf = self.get_atlas().rasterize(data)
+        self._cache_chunk(cx, cy, surf, np.bincount(data.ravel()) > 0)
+        return surf
+
+    def render_region(self, map_obj, x, y, w, h):
+        """A new surface showing map cells [x, x + w) x [y, y + h) at the current zoom.
+
+        Composed from the chunk cache, building every missing chunk: unlike draw_map there is
+        no build budget, placeholder or quality step, and nothing is drawn over the map.
+        """
+        self.set_map(map_obj)
+        self.apply_patches(map_obj.data)
+        # Zoomed out, a pixel starts on a multiple of mip cells
+        x, y = max(0, x - x % self.mip), max(0, y - y % self.mip)
+        w, h = min(w, map_obj.width - x), min(h, map_obj.height - y)
+        surf = pygame.Surface((max(1, self.cell_to_px(w)), max(1, self.cell_to_px(h))))
+        if w <= 0 or h <= 0:
+            return surf
+        span = self.chunk_span()
+        zoom = self.zoom_key()
+        for cy in range(y // span, (y + h - 1) // span + 1):
+            for cx in range(x // span, (x + w - 1) // span + 1):
+                chunk = self.chunk_cache.get(zoom + (cx, cy))
+                if chunk is None:
+                    chunk = self._render_chunk(map_obj, cx, cy)
+                surf.blit(chunk, (self.cell_to_px(cx * span - x), self.cell_to_px(cy * span - y)))
         return surf
 
     def draw_map(self, session):
         # Clear the whole screen first to ensure no bleeding behind status bar
         self.screen.fill((0, 0, 0))
         
+        # Time since the last phase (clearing the screen, states beneath) is not the map's
+        self.profiler.lap('other')
+
         # Set clipping to viewport
         viewport_rect = pygame.Rect(0, 0, session.viewport_px_w, session.viewport_px_h)
         self.screen.set_clip(viewport_rect)
         
+        self.set_map(session.map_obj)
         map_data = session.map_obj.data
+        self.apply_patches(map_data)
         cam_x, cam_y = session.camera_x, session.camera_y
         view_w = session.view_width
         view_h = session.view_height
         tile_size = self.tile_size
-        tool_state = session.tool_state
+        
+        to_px = self.cell_to_px
+        span = self.chunk_span()
         
         # 1. Determine visible chunks
         # Use floor/ceil to ensure we cover every visible pixel
-        start_cx = int(cam_x // self.chunk_size)
-        start_cy = int(cam_y // self.chunk_size)
+        start_cx = int(cam_x // span)
+        start_cy = int(cam_y // span)
         
         # Calculate how many chunks are needed to cover the view width/height
         # Adding 1 or 2 as a buffer to avoid "rendering in" artifacts at edges
-        end_cx = int((cam_x + view_w + 1) // self.chunk_size)
-        end_cy = int((cam_y + view_h + 1) // self.chunk_size)
+        end_cx = int((cam_x + view_w + 1) // span)
+        end_cy = int((cam_y + view_h + 1) // span)
         
+        # Eviction prefers chunks far from the middle of the view, and other zoom levels first
+        zoom = self.zoom_key()
+        focus_cx = int((cam_x + view_w // 2) // span)
+        focus_cy = int((cam_y + view_h // 2) // span)
+        self.chunk_cache.set_focus(zoom + (focus_cx, focus_cy))
+        # Zoomed out past glyphs, animated tiles show their first frame's flat color
+        anim = None if self.pixel_mode else self._animation_state(session)
+
         # 2. Draw visible chunks
+        missing = []
         for cy in range(start_cy, end_cy + 1):
-            if cy < 0 or cy * self.chunk_size >= session.map_obj.height: continue
+            if cy < 0 or cy * span >= session.map_obj.height: continue
             for cx in range(start_cx, end_cx + 1):
-                if cx < 0 or cx * self.chunk_size >= session.map_obj.width: continue
+                if cx < 0 or cx * span >= session.map_obj.width: continue
                 
-                if (cx, cy) not in self.chunk_cache:
-                    self.chunk_cache[(cx, cy)] = self._render_chunk(session, cx, cy)
+                chunk_surf = self.chunk_cache.get(zoom + (cx, cy))
+                if chunk_surf is None:
+                    missing.append((cx, cy))
+                    continue
+                self.prefetcher.note_visible(zoom + (cx, cy), True)
+                if anim:
+                    self._animate_chunk(zoom + (cx, cy), chunk_surf, anim)
                 
-                chunk_surf = self.chunk_cache[(cx, cy)]
-                px = (cx * self.chunk_size - cam_x) * tile_size
-                py = (cy * self.chunk_size - cam_y) * tile_size
-                self.screen.blit(chunk_surf, (px, py))
+                self.screen.blit(chunk_surf, (to_px(cx * span - cam_x), to_px(cy * span - cam_y)))
+
+        # Build missing chunks nearest the center first. Once the frame's build budget is
+        # spent, chunks that can borrow a scaled placeholder from another zoom level wait,
+        # and below full quality so do the rest, drawn as flat colors.
+        missing.sort(key=lambda c: max(abs(c[0] - focus_cx), abs(c[1] - focus_cy)))
+        deadline = time.perf_counter() + self.BUILD_BUDGET_MS * self.quality / self.QUALITY_FULL / 1000
+        degraded = self.quality < self.QUALITY_FULL and not self.pixel_mode
+        self.pending_chunks = 0
+        built = 0
+        for cx, cy in missing:
+            chunk_surf = None
+            pos = (to_px(cx * span - cam_x), to_px(cy * span - cam_y))
+            if built and time.perf_counter() > deadline:
+                chunk_surf = self._placeholder(cx, cy)
+                if chunk_surf is None and degraded:
+                    self._draw_flat_chunk(session, cx, cy, pos)
+                    self.pending_chunks += 1
+                    continue
+            if chunk_surf is None:
+                start = time.perf_counter()
+                chunk_surf = self._render_chunk(session.map_obj, cx, cy)
+                self.profiler.add('chunk build', (time.perf_counter() - start) * 1000)
+                self.prefetcher.note_visible(zoom + (cx, cy), False)
+                built += 1
+                if anim:
+                    self._animate_chunk(zoom + (cx, cy), chunk_surf, anim)
+            else:
+                self.pending_chunks += 1
+            self.screen.blit(chunk_surf, pos)
+
+        if self.placeholders:
+            # Drop the stand-ins of chunks panned out of view
+            self.placeholders = {k: v for k, v in self.placeholders.items()
+                                 if k[:3] != zoom or (start_cx <= k[3] <= end_cx and start_cy <= k[4] <= end_cy)}
+
+        # Queue the ring around the view for the prefetcher, see EditorState.update
+        self.prefetcher.observe(session, (start_cx, start_cy, end_cx, end_cy))
+        self._finish_animation(anim)
+        self.profiler.lap('chunk blit')
+
+        self._draw_overlays(session)
+        self._draw_tool_preview(session)
+        self.profiler.lap('overlays')
+        
+        # Reset clipping for UI elements
+        self.screen.set_clip(None)
+        
+        session.status_y = self.height - 110
+
+    def _draw_overlays(self, session):
+        """Selection, brush ghost and cursor share one translucent layer, the measurement grid another.
+
+        Each layer is recomposed only when its inputs change and is otherwise blitted as is.
+        """
+        ts = session.tool_state
+        view = (session.camera_x, session.camera_y, session.view_width, session.view_height, self.zoom_key(),
+                session.viewport_px_w, session.viewport_px_h, session.map_obj.width, session.map_obj.height)
+
+        if ts.measurement_active:
+            cfg = ts.measurement_config
+            key = view + (self.quality == self.QUALITY_FULL, cfg.get('grid_size', 100), cfg.get('show_coords', True), tuple(cfg.get('color', (0, 255, 255))),
+                          tuple(tuple(p) for p in cfg.get('points', [])))
+            if self.grid_key != key:
+                self.grid_surface = self._compose_measurement_grid(session)
+                self.grid_key = key
+            if self.grid_surface:
+                self.screen.blit(self.grid_surface, (0, 0))
+
+        key = view + (session.selection_start, session.selection_end, session.cursor_x, session.cursor_y, ts.brush_size)
+        if self.highlight_key != key:
+            self._compose_highlights(session)
+            self.highlight_key = key
+        if self.highlight_surface:
+            self.screen.blit(self.highlight_surface, self.highlight_pos)
 
-        # Clipping bounds for overlays (UI area check)
-        # We don't want to draw map overlays over the status bar
+        if ts.measurement_active:
+            self._draw_sector_info(session)
+
+    def _compose_highlights(self, session):
+        cam_x, cam_y = session.camera_x, session.camera_y
+        view_w = session.view_width
+        view_h = session.view_height
+        tool_state = session.tool_state
+        to_px = self.cell_to_px
         
         # Pre-calculate viewport bounds within the map for overlays
         start_vx = max(0, -cam_x)
@@ -151,6 +730,9 @@ class Renderer:
         end_vx = min(view_w, session.map_obj.width - cam_x)
         end_vy = min(view_h, session.map_obj.height - cam_y)
 
+        # (rect, fill color, border color) in screen pixels, drawn in order
+        shapes = []
+
         # Selection highlight
         if session.selection_start:
             x0, y0 = session.selection_start
@@ -167,16 +749,14 @@ class Renderer:
             iy1 = min(sy1, cam_y + end_vy - 1)
             
             if ix0 <= ix1 and iy0 <= iy1:
-                sel_px = (ix0 - cam_x) * tile_size
-                sel_py = (iy0 - cam_y) * tile_size
-                sel_pw = (ix1 - ix0 + 1) * tile_size
-                sel_ph = (iy1 - iy0 + 1) * tile_size
+                sel_px = to_px(ix0 - cam_x)
+                sel_py = to_px(iy0 - cam_y)
+                sel_pw = max(1, to_px(ix1 - ix0 + 1))
+                sel_ph = max(1, to_px(iy1 - iy0 + 1))
                 
-                # Draw filled rect and border
-                color = (60, 60, 120) if session.selection_end else (60, 60, 180, 100)
-                # Use surface for alpha if needed, or just solid
-                pygame.draw.rect(self.screen, color, (sel_px, sel_py, sel_pw, sel_ph))
-                pygame.draw.rect(self.screen, (100, 100, 255), (sel_px, sel_py, sel_pw, sel_ph), 2)
+                # Translucent fill so the selected tiles stay visible, solid border
+                color = (60, 60, 180, 90) if session.selection_end else (60, 60, 180, 60)
+                shapes.append((pygame.Rect(sel_px, sel_py, sel_pw, sel_ph), color, (100, 100, 255, 255)))
 
         # Brush bounds for ghosting
         br = tool_state.brush_size
@@ -191,45 +771,51 @@ class Renderer:
         iby1 = min(by1, cam_y + end_vy - 1)
 
         if ibx0 <= ibx1 and iby0 <= iby1:
-            b_px = (ibx0 - cam_x) * tile_size
-            b_py = (iby0 - cam_y) * tile_size
-            b_pw = (ibx1 - ibx0 + 1) * tile_size
-            b_ph = (iby1 - iby0 + 1) * tile_size
-            pygame.draw.rect(self.screen, (100, 100, 100), (b_px, b_py, b_pw, b_ph))
+            b_px = to_px(ibx0 - cam_x)
+            b_py = to_px(iby0 - cam_y)
+            b_pw = max(1, to_px(ibx1 - ibx0 + 1))
+            b_ph = max(1, to_px(iby1 - iby0 + 1))
+            shapes.append((pygame.Rect(b_px, b_py, b_pw, b_ph), (160, 160, 160, 80), None))
             
             # Bright cursor center
             if ibx0 <= session.cursor_x <= ibx1 and iby0 <= session.cursor_y <= iby1:
-                c_px = (session.cursor_x - cam_x) * tile_size
-                c_py = (session.cursor_y - cam_y) * tile_size
-                pygame.draw.rect(self.screen, (200, 200, 200), (c_px, c_py, tile_size, tile_size))
+                c_px = to_px(session.cursor_x - cam_x)
+                c_py = to_px(session.cursor_y - cam_y)
+                c_size = max(1, to_px(1))
+                shapes.append((pygame.Rect(c_px, c_py, c_size, c_size), (220, 220, 220, 150), None))
 
-        self._draw_tool_preview(session)
-        self._draw_measurement_overlay(session)
-        
-        # Reset clipping for UI elements
-        self.screen.set_clip(None)
-        
-        session.status_y = self.height - 110
-        self.draw_notifications()
+        self.highlight_surface = None
+        if not shapes:
+            return
+        # The layer only covers the highlighted area, so the per-frame blit stays small
+        bounds = shapes[0][0].unionall([r for r, _, _ in shapes[1:]])
+        surf = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for rect, fill, border in shapes:
+            rect = rect.move(-bounds.x, -bounds.y)
+            surf.fill(fill, rect)
+            if border:
+                pygame.draw.rect(surf, border, rect, 2)
+        self.highlight_surface = surf
+        self.highlight_pos = bounds.topleft
 
-    def _draw_measurement_overlay(self, session):
-        if not session.tool_state.measurement_active: return
-        
+    def _compose_measurement_grid(self, session):
         cfg = session.tool_state.measurement_config
         grid_size = int(cfg.get('grid_size', 100))
         show_coords = cfg.get('show_coords', True)
         color = cfg.get('color', (0, 255, 255))
         points = cfg.get('points', [])
         
-        if grid_size <= 0: return
+        if grid_size <= 0: return None
 
+        surf = pygame.Surface((session.viewport_px_w, session.viewport_px_h), pygame.SRCALPHA)
         cam_x, cam_y = int(session.camera_x), int(session.camera_y)
         view_w, view_h = int(session.view_width), int(session.view_height)
         
-        vx0 = max(0, -cam_x) * self.tile_size
-        vy0 = max(0, -cam_y) * self.tile_size
-        vx1 = min(view_w, session.map_obj.width - cam_x) * self.tile_size
-        vy1 = min(view_h, session.map_obj.height - cam_y) * self.tile_size
+        to_px = self.cell_to_px
+        vx0 = to_px(max(0, -cam_x))
+        vy0 = to_px(max(0, -cam_y))
+        vx1 = to_px(min(view_w, session.map_obj.width - cam_x))
+        vy1 = to_px(min(view_h, session.map_obj.height - cam_y))
 
         start_x = (cam_x // grid_size) * grid_size
         start_y = (cam_y // grid_size) * grid_size
@@ -240,46 +826,56 @@ class Renderer:
         end_y = min(end_y, session.map_obj.height)
 
         # Performance guard: Don't render too many labels
-        pixel_grid = grid_size * self.tile_size
-        render_labels = show_coords and (pixel_grid > 20)
+        pixel_grid = to_px(grid_size)
+        render_labels = show_coords and (pixel_grid > 20) and self.quality == self.QUALITY_FULL
 
         for x in range(int(start_x), int(end_x) + 1, grid_size):
             if x < cam_x or x > end_x: continue
-            px = (x - cam_x) * self.tile_size
-            pygame.draw.line(self.screen, color, (int(px), int(vy0)), (int(px), int(vy1)), 2)
+            px = to_px(x - cam_x)
+            pygame.draw.line(surf, color, (int(px), int(vy0)), (int(px), int(vy1)), 2)
             if render_labels:
-                 surf = self.font.render(f"X:{x}", True, color)
-                 self.screen.blit(surf, (int(px) + 4, int(vy0) + 5))
+                 label = self.text_cache.render(self.font, f"X:{x}", color)
+                 surf.blit(label, (int(px) + 4, int(vy0) + 5))
 
         for y in range(int(start_y), int(end_y) + 1, grid_size):
             if y < cam_y or y > end_y: continue
-            py = (y - cam_y) * self.tile_size
-            pygame.draw.line(self.screen, color, (int(vx0), int(py)), (int(vx1), int(py)), 2)
+            py = to_px(y - cam_y)
+            pygame.draw.line(surf, color, (int(vx0), int(py)), (int(vx1), int(py)), 2)
             if render_labels:
-                 surf = self.font.render(f"Y:{y}", True, color)
-                 self.screen.blit(surf, (int(vx0) + 5, int(py) + 4))
+                 label = self.text_cache.render(self.font, f"Y:{y}", color)
+                 surf.blit(label, (int(vx0) + 5, int(py) + 4))
 
         if points:
             last_p = None
             for p in points:
-                px = (p[0] - cam_x) * self.tile_size + self.tile_size // 2
-                py = (p[1] - cam_y) * self.tile_size + self.tile_size // 2
+                px = to_px(p[0] - cam_x) + self.tile_size // 2
+                py = to_px(p[1] - cam_y) + self.tile_size // 2
                 
                 if 0 <= px <= self.width and 0 <= py <= self.height - 120:
-                    pygame.draw.circle(self.screen, (255, 100, 100), (int(px), int(py)), 5)
+                    pygame.draw.circle(surf, (255, 100, 100), (int(px), int(py)), 5)
                     
                     if last_p:
-                        lpx = (last_p[0] - cam_x) * self.tile_size + self.tile_size // 2
-                        lpy = (last_p[1] - cam_y) * self.tile_size + self.tile_size // 2
-                        pygame.draw.line(self.screen, (255, 100, 100), (int(lpx), int(lpy)), (int(px), int(py)), 2)
+                        lpx = to_px(last_p[0] - cam_x) + self.tile_size // 2
+                        lpy = to_px(last_p[1] - cam_y) + self.tile_size // 2
+                        pygame.draw.line(surf, (255, 100, 100), (int(lpx), int(lpy)), (int(px), int(py)), 2)
                         
                         dist = get_distance(last_p, p)
                         mid_x, mid_y = (lpx + px) // 2, (lpy + py) // 2
                         if 0 <= mid_x <= self.width and 0 <= mid_y <= self.height - 120:
-                            d_surf = self.font.render(f"{dist:.1f}", True, (255, 200, 200))
-                            self.screen.blit(d_surf, (int(mid_x), int(mid_y)))
+                            d_surf = self.text_cache.render(self.font, f"{dist:.1f}", (255, 200, 200))
+                            surf.blit(d_surf, (int(mid_x), int(mid_y)))
                 last_p = p
 
+        # Mostly transparent and redrawn rarely: RLE makes the per-frame blit skip empty runs
+        surf.set_alpha(255, pygame.RLEACCEL)
+        return surf
+
+    def _draw_sector_info(self, session):
+        cfg = session.tool_state.measurement_config
+        grid_size = int(cfg.get('grid_size', 100))
+        color = cfg.get('color', (0, 255, 255))
+        if grid_size <= 0: return
+
         # Live Sector Info
         sec_x = session.cursor_x // grid_size
         sec_y = session.cursor_y // grid_size
@@ -292,67 +888,115 @@ class Renderer:
             f"TOTAL:  {session.cursor_x}, {session.cursor_y}"
         ]
         
-        y_off = self.height - 180
+        # Relative to the surface being drawn, so each split view gets its own
+        width, height = self.screen.get_size()
+        y_off = height - 180
         for line in info_lines:
-            surf = self.font.render(line, True, color)
-            self.screen.blit(surf, (self.width - surf.get_width() - 10, y_off))
+            surf = self.text_cache.render(self.font, line, color)
+            self.screen.blit(surf, (width - surf.get_width() - 10, y_off))
             y_off += 22
 
     def _draw_tool_preview(self, session):
         ts = session.tool_state
         if not ts.start_point: return
 
+        # The preview only changes with the shape's end points or the view, so reuse the last one
+        key = (ts.mode, ts.start_point, session.cursor_x, session.cursor_y, session.camera_x, session.camera_y,
+               self.zoom_key(), session.viewport_px_w, session.viewport_px_h)
+        if self.preview_key != key:
+            self._compose_tool_preview(session)
+            self.preview_key = key
+        if self.preview_surface:
+            self.screen.blit(self.preview_surface, self.preview_pos)
+
+    def _compose_tool_preview(self, session):
+        ts = session.tool_state
         sx, sy = ts.start_point
         cx, cy = session.cursor_x, session.cursor_y
         cam_x, cam_y = session.camera_x, session.camera_y
+        # Only generate the part of the shape that can be on screen
+        vw, vh = self.view_cells(session.viewport_px_w, session.viewport_px_h)
+        clip = (cam_x - 1, cam_y - 1, cam_x + vw + 1, cam_y + vh + 1)
         
         points = []
         if ts.mode == 'rect' or ts.mode == 'select':
-            points = get_rect_points(sx, sy, cx, cy, filled=False)
+            points = get_rect_points(sx, sy, cx, cy, filled=False, clip=clip)
         elif ts.mode == 'line':
-            points = get_line_points(sx, sy, cx, cy)
+            points = get_line_points(sx, sy, cx, cy, clip=clip)
         elif ts.mode == 'circle':
             radius = int(get_distance((sx, sy), (cx, cy)))
-            points = get_circle_points(sx, sy, radius, filled=False)
+            points = get_circle_points(sx, sy, radius, filled=False, clip=clip)
         
         color = (255, 255, 0) # Yellow for preview
         if ts.mode == 'select': color = (100, 100, 255) # Blue for selection
+
+        self.preview_surface = None
+        if not points:
+            return
+        # The overlay only spans the shape's visible bounding box, keeping the per-frame blit small
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        ox, oy = min(xs), min(ys)
+        to_px = self.cell_to_px
+        cell = max(1, to_px(1))
+        surf = pygame.Surface((to_px(max(xs) - ox) + cell, to_px(max(ys) - oy) + cell), pygame.SRCALPHA)
         
-        # Draw each point as a tile highlight
+        # Draw each point as a hollow square tile highlight
         for px, py in points:
-            # Simple bounds check to avoid drawing off-screen too much
-            # (Pygame handles off-screen drawing, but no need to process huge lists if way off)
-            if px < cam_x - 1 or py < cam_y - 1 or \
-               px > cam_x + (self.width // self.tile_size) + 1 or \
-               py > cam_y + (self.height // self.tile_size) + 1:
-                continue
+            pygame.draw.rect(surf, color, (to_px(px - ox), to_px(py - oy), cell, cell), 1)
+        surf.set_alpha(255, pygame.RLEACCEL)
+        self.preview_surface = surf
+        self.preview_pos = (to_px(ox - cam_x), to_px(oy - cam_y))
 
-            scr_x = (px - cam_x) * self.tile_size
-            scr_y = (py - cam_y) * self.tile_size
-            
-            # Draw a hollow square for the tile
-            pygame.draw.rect(self.screen, color, (scr_x, scr_y, self.tile_size, self.tile_size), 1)
+    def status_rect(self, session):
+        return pygame.Rect(0, session.status_y, self.width, self.STATUS_PANEL_H)
 
     def draw_status(self, session):
-        y_base = session.status_y + 10
+        ts = session.tool_state
+        sel_tile = REGISTRY.get(session.selected_tile_id)
+        # Everything the panel shows; it is only recomposed when one of these changes
+        key = (
+            self.width, REGISTRY.version, session.selected_tile_id,
+            ts.mode, ts.recording, session.cursor_x, session.cursor_y, session.camera_x, session.camera_y,
+            ts.brush_size, bool(ts.brush_shape), ts.auto_tiling, ts.snap_size,
+            session.map_obj.width, session.map_obj.height, session.active_tab, len(session.tabs),
+            session.undo_stack.undo_count, session.undo_stack.redo_count,
+        )
+        if self.status_surface is None or self.status_key != key:
+            self.status_surface = self._compose_status(session, sel_tile)
+            self.status_key = key
+        self.screen.blit(self.status_surface, (0, session.status_y))
+        # Cost of the last frame; a separate label so the panel is not recomposed every frame. The text
+        # changes nearly every frame, so it is rendered directly, not through text_cache, and throttled.
+        now = time.perf_counter()
+        if (self.frame_label is None or self.frame_label_key[0] != self.quality
+                or now - self.frame_label_key[1] > self.FRAME_LABEL_REFRESH):
+            text = f"FRAME: {self.frame_ms:4.1f}ms {self.QUALITY_NAMES[self.quality]}"
+            self.frame_label = self.font.render(text, True, (150, 150, 150))
+            self.frame_label_key = (self.quality, now)
+        label = self.frame_label
+        self.screen.blit(label, (self.width - label.get_width() - 10, session.status_y + 10))
+
+    def _compose_status(self, session, sel_tile):
+        surf = pygame.Surface((self.width, self.STATUS_PANEL_H), pygame.SRCALPHA)
+        text = self.text_cache.render
+        y_base = 10
         ts = session.tool_state
         
         # 1. Active Tile Preview Box
         preview_rect = (10, y_base, 60, 60)
-        pygame.draw.rect(self.screen, (30, 30, 30), preview_rect)
-        pygame.draw.rect(self.screen, (150, 150, 150), preview_rect, 1)
+        pygame.draw.rect(surf, (30, 30, 30), preview_rect)
+        pygame.draw.rect(surf, (150, 150, 150), preview_rect, 1)
         
-        sel_tile = REGISTRY.get(session.selected_tile_id)
         if sel_tile:
             # Draw a larger version of the tile character
-            big_font = pygame.font.SysFont("Courier New", 40, bold=True)
-            char_surf = big_font.render(sel_tile.char, True, 
-                                        COLOR_MAP.get(sel_tile.color.lower(), (255, 255, 255)) 
-                                        if isinstance(sel_tile.color, str) else sel_tile.color)
-            self.screen.blit(char_surf, (preview_rect[0] + 15, preview_rect[1] + 5))
+            if self.big_font is None:
+                self.big_font = self._load_font(40)
+            char_surf = text(self.big_font, sel_tile.char, REGISTRY.tables.color_of(sel_tile.id))
+            surf.blit(char_surf, (preview_rect[0] + 15, preview_rect[1] + 5))
             
-            name_surf = self.font.render(sel_tile.name[:10], True, (150, 150, 150))
-            self.screen.blit(name_surf, (preview_rect[0], preview_rect[1] + 65))
+            name_surf = text(self.font, sel_tile.name[:10], (150, 150, 150))
+            surf.blit(name_surf, (preview_rect[0], preview_rect[1] + 65))
 
         # 2. Detailed Info Columns
         col1_x = 85
@@ -378,70 +1022,93 @@ class Renderer:
 
         # Column 3: Stats & Quick Keys
         lines_c3 = [
-            f"MAP:  {session.map_obj.width}x{session.map_obj.height}",
+            f"MAP:  {session.map_obj.width}x{session.map_obj.height}"
+            + (f"  [{session.active_tab + 1}/{len(session.tabs)}]" if len(session.tabs) > 1 else ""),
             f"UNDO: {session.undo_stack.undo_count} / REDO: {session.undo_stack.redo_count}",
             "[F1] Menu | [?] Help | [Q] Quit"
         ]
 
         for i, line in enumerate(lines_c1):
-            self.screen.blit(self.font.render(line, True, (255, 255, 255)), (col1_x, y_base + i * 22))
+            surf.blit(text(self.font, line, (255, 255, 255)), (col1_x, y_base + i * 22))
         for i, line in enumerate(lines_c2):
-            self.screen.blit(self.font.render(line, True, (200, 200, 255) if "ENABLED" in line or "ON" in line else (200, 200, 200)), (col2_x, y_base + i * 22))
+            surf.blit(text(self.font, line, (200, 200, 255) if "ENABLED" in line or "ON" in line else (200, 200, 200)), (col2_x, y_base + i * 22))
         for i, line in enumerate(lines_c3):
-            self.screen.blit(self.font.render(line, True, (200, 255, 200)), (col3_x, y_base + i * 22))
+            surf.blit(text(self.font, line, (200, 255, 200)), (col3_x, y_base + i * 22))
+        return surf
+
+    def palette_layout(self):
+        """(palette_w, palette_h, visible_rows) of the palette for the current registry and screen."""
+        grid = self.palette
+        palette_w = grid.cols * grid.spacing + 30
+        palette_h = min(grid.row_count() * grid.spacing + 60, self.height - 100) # Cap height
+        return palette_w, palette_h, max(1, (palette_h - 40) // grid.spacing)
+
+    def draw_profiler(self):
+        """Profiler HUD in the top-left corner while enabled. Returns its rect, or None when hidden.
+
+        The stats are recomposed a few times a second so the numbers stay readable and the HUD
+        does not churn the text cache.
+        """
+        if not self.profiler.enabled: return None
+        now = time.perf_counter()
+        if self.profiler_surface is None or now - self.profiler_time > self.PROFILER_REFRESH:
+            self.profiler_surface = self._compose_profiler()
+            self.profiler_time = now
+        return self.screen.blit(self.profiler_surface, (10, 10))
+
+    def _compose_profiler(self):
+        if self.profiler_font is None:
+            self.profiler_font = self._load_font(14)
+        font = self.profiler_font
+        rows, (frame_avg, frame_max, hits, misses) = self.profiler.summary()
+        lines = [(f"{'PHASE':<12}{'AVG':>7}{'MAX':>7} ms", (200, 200, 200))]
+        lines += [(f"{name:<12}{avg:7.2f}{peak:7.2f}", (255, 255, 255) if avg >= 1 else (150, 150, 150))
+                  for name, avg, peak in rows]
+        lines.append((f"{'frame':<12}{frame_avg:7.2f}{frame_max:7.2f}", (255, 255, 0)))
+        lines.append((f"chunks/frame hit {hits:.1f} miss {misses:.1f}", (200, 255, 200)))
+        lines.append((f"last {len(self.profiler.frames)} drawn frames", (150, 150, 150)))
+        line_h = font.get_linesize()
+        labels = [font.render(text, True, color) for text, color in lines]
+        surf = pygame.Surface((max(l.get_width() for l in labels) + 16, line_h * len(labels) + 12), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 200))
+        for i, label in enumerate(labels):
+            surf.blit(label, (8, 6 + i * line_h))
+        return surf
+
+    def draw_minimap(self, session, bottom):
+        """Minimap in the bottom-left corner of the map area ending at y=bottom. Returns its rect, or None when hidden."""
+        if not session.tool_state.show_minimap: return None
+        h = self.minimap.refresh(session.map_obj).get_height()
+        return self.minimap.draw(self.screen, session, (10, bottom - 10 - h))
 
     def draw_palette(self, session):
         if not session.tool_state.show_palette: return None
 
-        all_tiles = list(REGISTRY.get_all())
-        if not all_tiles: return None
+        grid = self.palette
+        if not grid.refresh(): return None
         
         # Layout
-        cols = 5
-        tile_spacing = 35
-        # Calculate height based on rows
-        rows = (len(all_tiles) + cols - 1) // cols
-        palette_w = cols * tile_spacing + 30
-        palette_h = rows * tile_spacing + 60
-        palette_h = min(palette_h, self.height - 100) # Cap height
-        
+        palette_w, palette_h, visible_rows = self.palette_layout()
         x_base = self.width - palette_w - 20
         y_base = 60 # Below top bar/status
+
+        # Keep the selected tile in view when it changes from the keyboard
+        if session.selected_tile_id != self.palette_selected:
+            self.palette_selected = session.selected_tile_id
+            if session.selected_tile_id in grid.tile_ids:
+                grid.ensure_visible(grid.tile_ids.index(session.selected_tile_id), visible_rows)
         
-        # Background
-        s = pygame.Surface((palette_w, palette_h), pygame.SRCALPHA)
-        s.fill((30, 30, 30, 230))
-        self.screen.blit(s, (x_base, y_base))
-        pygame.draw.rect(self.screen, (200, 200, 200), (x_base, y_base, palette_w, palette_h), 2)
-        
-        # Title
-        title = self.font.render("PALETTE", True, (255, 255, 0))
-        self.screen.blit(title, (x_base + (palette_w - title.get_width())//2, y_base + 10))
-        
-        clickable_rects = []
-        
-        start_x = x_base + 15
-        start_y = y_base + 40
-        
-        for i, tile in enumerate(all_tiles):
-            c = i % cols
-            r = i // cols
-            
-            px = start_x + c * tile_spacing
-            py = start_y + r * tile_spacing
-            
-            if py + tile_spacing > y_base + palette_h: break
-            
-            rect = pygame.Rect(px, py, self.tile_size, self.tile_size)
-            clickable_rects.append((rect, tile.id))
-            
+        panel = self.palette_panel
+        if panel.begin(self.font, (palette_w, palette_h)):
+            title = self.text_cache.render(self.font, "PALETTE", (255, 255, 0))
+            panel.surface.blit(title, ((palette_w - title.get_width())//2, 10))
+
+        def style(index, tid):
             # Highlight selected
-            if tile.id == session.selected_tile_id:
-                pygame.draw.rect(self.screen, (255, 255, 0), (px-2, py-2, self.tile_size+4, self.tile_size+4), 2)
-            
-            glyph = self.get_glyph(tile.id)
-            if glyph:
-                self.screen.blit(glyph, (px, py))
-                
+            return (None, (255, 255, 0) if tid == session.selected_tile_id else None)
+        cells = grid.draw(panel, self.get_ui_atlas(), (15, 40), visible_rows, style)
+        panel.blit(self.screen, (x_base, y_base))
+
+        clickable_rects = [(rect.move(x_base, y_base), tid) for rect, tid in cells]
         return pygame.Rect(x_base, y_base, palette_w, palette_h), clickable_rects
 
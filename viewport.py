@@ -0,0 +1,140 @@
+import math
+import pygame
+from prefetch import ChunkPrefetcher
+
+class Viewport:
+    """One view onto the session's map: a screen rect with its own camera and zoom.
+
+    The session and renderer always hold the state of the view being edited or
+    drawn; `save` copies it into the viewport and `load` puts it back. Overlay
+    layers keyed by camera and zoom travel with the view so views do not keep
+    recomposing each other's, while the glyph and chunk caches stay shared.
+    """
+    SESSION_ATTRS = ('camera_x', 'camera_y')
+    RENDERER_ATTRS = ('tile_size', 'mip', 'prefetcher',
+                      'highlight_surface', 'highlight_pos', 'highlight_key',
+                      'grid_surface', 'grid_key', 'preview_surface', 'preview_pos', 'preview_key')
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.state = {}
+
+    def save(self, session, renderer):
+        self.state = {name: getattr(session, name) for name in self.SESSION_ATTRS}
+        self.state.update((name, getattr(renderer, name)) for name in self.RENDERER_ATTRS)
+
+    def load(self, session, renderer):
+        for name in self.SESSION_ATTRS:
+            setattr(session, name, self.state[name])
+        for name in self.RENDERER_ATTRS:
+            setattr(renderer, name, self.state[name])
+        session.viewport_px_w, session.viewport_px_h = self.rect.size
+        session.view_width, session.view_height = renderer.view_cells(*self.rect.size)
+        # The map may have changed size while another view was active
+        session.camera_x = max(0, min(session.camera_x, session.map_obj.width - session.view_width))
+        session.camera_y = max(0, min(session.camera_y, session.map_obj.height - session.view_height))
+
+    def clone(self, renderer):
+        """A new view with this one's camera and zoom and fresh overlay layers."""
+        view = Viewport(self.rect)
+        view.state = dict(self.state, prefetcher=ChunkPrefetcher(renderer),
+                          highlight_surface=None, highlight_key=None,
+                          grid_surface=None, grid_key=None, preview_surface=None, preview_key=None)
+        return view
+
+class SplitView:
+    """The editor's viewports, laid out in a grid over the map area.
+
+    One view is active: its camera and zoom are the ones in the session and
+    renderer, so actions and mouse input apply to it unchanged. `draw` loads
+    each view in turn and draws it into a subsurface of the screen.
+    """
+    MAX_VIEWS = 4
+    # Pixels between neighbouring views
+    GAP = 4
+
+    def __init__(self, session, renderer, area):
+        self.session = session
+        self.renderer = renderer
+        self.area = pygame.Rect(area)
+        self.views = [Viewport(self.area)]
+        self.active = 0
+        self.views[0].save(session, renderer)
+
+    @property
+    def split(self):
+        return len(self.views) > 1
+
+    def active_rect(self):
+        return self.views[self.active].rect
+
+    def layout(self, area):
+        """Place the views in a grid filling area and apply the active view's size."""
+        self.area = pygame.Rect(area)
+        count = len(self.views)
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+        w = (self.area.w - self.GAP * (cols - 1)) // cols
+        h = (self.area.h - self.GAP * (rows - 1)) // rows
+        for i, view in enumerate(self.views):
+            row, col = divmod(i, cols)
+            view.rect = pygame.Rect(self.area.x + col * (w + self.GAP), self.area.y + row * (h + self.GAP), w, h)
+        self.views[self.active].save(self.session, self.renderer)
+        self.views[self.active].load(self.session, self.renderer)
+
+    def set_count(self, count):
+        count = max(1, min(self.MAX_VIEWS, count))
+        if count == len(self.views):
+            return
+        current = self.views[self.active]
+        current.save(self.session, self.renderer)
+        while len(self.views) < count:
+            self.views.append(current.clone(self.renderer))
+        # Closing views keeps the active one
+        others = [v for v in self.views if v is not current][:count - 1]
+        self.views = [current] + others
+        self.active = 0
+        self.layout(self.area)
+
+    def view_at(self, pos):
+        for i, view in enumerate(self.views):
+            if view.rect.collidepoint(pos):
+                return i
+        return None
+
+    def focus(self, index):
+        """Make views[index] the active view. Returns True if it changed."""
+        if index is None or index == self.active:
+            return False
+        self.views[self.active].save(self.session, self.renderer)
+        self.active = index
+        self.views[index].load(self.session, self.renderer)
+        return True
+
+    def to_local(self, pos):
+        rect = self.active_rect()
+        return pos[0] - rect.x, pos[1] - rect.y
+
+    def draw(self, screen):
+        """Draw every view with Renderer.draw_map, then restore the active one."""
+        r = self.renderer
+        if not self.split:
+            r.draw_map(self.session)
+            return
+        active = self.views[self.active]
+        active.save(self.session, r)
+        pending = 0
+        delays = []
+        for view in self.views:
+            view.load(self.session, r)
+            r.screen = screen.subsurface(view.rect)
+            r.draw_map(self.session)
+            view.save(self.session, r)
+            pending += r.pending_chunks
+            if r.next_animation is not None:
+                delays.append(r.next_animation)
+        r.screen = screen
+        active.load(self.session, r)
+        r.pending_chunks = pending
+        r.next_animation = min(delays) if delays else None
+        pygame.draw.rect(screen, (255, 255, 0), active.rect.inflate(self.GAP, self.GAP), 1)